@@ -0,0 +1,20 @@
+"""
+NumPy is optional and slow to import, so the modules ask for it on first use instead of at
+import time.
+"""
+
+_numpy = False  # not looked up yet
+
+
+def numpy_or_none():
+    """
+    :return: the numpy module, or None when it is not installed
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
@@ -0,0 +1,118 @@
+"""
+Cost of the contract modes in avg, apply_discount and cancel_membership.
+
+For each function this compares a copy with the lesson's original assert (run with python -O
+to see the assert-free cost) against the library function with its contract off, sampled
+1 in N, sampled by time budget, and always checked.
+
+Run from the repository root:
+    python -m benchmarks.contracts_overhead --size 100000
+"""
+
+import argparse
+import gc
+import time
+
+import lesson
+import membership
+from contracts import contracts
+
+
+class Admin:
+    def is_admin(self):
+        return True
+
+
+def assert_avg(grades):
+    assert not len(grades) == 0, 'There is a list with no grades'
+    return sum(grades) / len(grades)
+
+
+def assert_apply_discount(product, discount):
+    price = round(product['price'] * (1.0 - (discount / 100)), 2)
+    assert 0 <= price <= product['price']
+    return price
+
+
+def assert_cancel_membership(membership_id, user, members):
+    if not user.is_admin():
+        raise membership.AuthorizationError('Must be admin to cancel')
+    cancelled = members.pop(membership_id)
+    if cancelled is None:
+        raise ValueError('Unknown id')
+    return cancelled
+
+
+def time_once(func, setup):
+    # setup runs outside the timed region, for cases that consume their input
+    argument = setup()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func(argument)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def best_of(func, setup, repeat):
+    time_once(func, setup)  # warm-up
+    return min(time_once(func, setup) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--sample', type=int, default=100, help="1 in N for the sampled run")
+    parser.add_argument('--budget', type=float, default=0.001, help="seconds of checks per second for the budget run")
+    args = parser.parse_args()
+
+    grades = [[80.0, 90.0, 90.0]] * args.size
+    products = [{'name': 'Trainers', 'price': float(i % 100 + 1)} for i in range(args.size)]
+    admin = Admin()
+
+    def store():
+        members = membership.MembershipStore(compact_min=args.size + 1)
+        for i in range(args.size):
+            members.add(i, 'Member %d' % i)
+        return members
+
+    def loop(func):
+        return lambda items: [func(item) for item in items]
+
+    cases = [
+        ('avg', lambda: grades, loop(assert_avg), loop(lesson.avg)),
+        ('apply_discount', lambda: products,
+         lambda items: [assert_apply_discount(product, 25) for product in items],
+         lambda items: [lesson.apply_discount(product, 25) for product in items]),
+        ('cancel_membership', store,
+         lambda members: [assert_cancel_membership(i, admin, members) for i in range(args.size)],
+         lambda members: [membership.cancel_membership(i, admin, members) for i in range(args.size)]),
+    ]
+    modes = [
+        ('off', dict(mode='off')),
+        ('sampled 1/%d' % args.sample, dict(mode='sampled', every=args.sample)),
+        ('budget %gs/s' % args.budget, dict(mode='sampled', budget=args.budget)),
+        ('always', dict(mode='always')),
+    ]
+
+    print("%-18s %-18s %10s %10s %10s" % ('function', 'mode', 'ns/call', 'overhead', 'checked'))
+    for name, setup, baseline, checked in cases:
+        reference = best_of(baseline, setup, args.repeat)
+        print("%-18s %-18s %10.1f %+9.1f%% %10s" % (
+            name, 'assert' if __debug__ else 'assert (-O)', reference / args.size * 1e9, 0.0, '-'))
+        for mode, settings in modes:
+            contracts.set_mode(name, **settings)
+            contracts.reset()
+            seconds = best_of(checked, setup, args.repeat)
+            calls = args.size * (args.repeat + 1)  # warm-up included
+            print("%-18s %-18s %10.1f %+9.1f%% %10.2f%%" % (
+                name, mode, seconds / args.size * 1e9, (seconds / reference - 1) * 100,
+                contracts.get(name).checked / calls * 100))
+        contracts.set_mode(name, 'always')
+    print("violations:", contracts.violations())
+
+
+if __name__ == '__main__':
+    main()
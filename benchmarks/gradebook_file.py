@@ -0,0 +1,72 @@
+"""
+Load time of a cohort: JSON against the mmap-loaded .gbk file.
+
+Both are measured up to the averages of every student, which is where get_stats spends its
+time once the gradebook is in memory.
+
+Run from the repository root:
+    python -m benchmarks.gradebook_file --students 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from gradebook import ColumnarGradebook
+from gradebook_file import GradebookFile, write_gradebook
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--grades', type=int, default=10, help="grades per student")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    grades = [[['Student%d' % i, 'Surname%d' % i], [rng.uniform(0, 100) for _ in range(args.grades)]]
+              for i in range(args.students)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'cohort.json')
+        gbk_path = os.path.join(directory, 'cohort.gbk')
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump(grades, file)
+        write_gradebook(gbk_path, grades)
+
+        def from_json():
+            with open(json_path, encoding='utf-8') as file:
+                return ColumnarGradebook.from_nested(json.load(file)).averages()
+
+        def from_gbk():
+            with GradebookFile(gbk_path) as gradebook:
+                return sum(gradebook.averages())
+
+        def open_gbk():
+            with GradebookFile(gbk_path) as gradebook:
+                return len(gradebook)
+
+        reference = best_of(from_json, args.repeat)
+        print("%-24s %10s %10s %10s" % ('load', 'size MB', 'ms', 'speed-up'))
+        for name, path, func in [('json + averages', json_path, from_json),
+                                 ('gbk + averages', gbk_path, from_gbk),
+                                 ('gbk open only', gbk_path, open_gbk)]:
+            seconds = reference if func is from_json else best_of(func, args.repeat)
+            print("%-24s %10.1f %10.1f %9.1fx" % (
+                name, os.path.getsize(path) / 1e6, seconds * 1000, reference / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Import-time budget of the library modules.
+
+Every module is imported in a fresh interpreter; the script fails when an import takes longer
+than its budget or pulls in NumPy, which the modules are only allowed to load on first use.
+
+Run from the repository root:
+    python -m benchmarks.import_time
+"""
+
+import argparse
+import subprocess
+import sys
+
+# milliseconds, on top of the bare interpreter start-up
+BUDGETS_MS = {
+    'lesson': 10,
+    'vat': 15,
+    'gradebook': 15,
+    'discount': 15,
+    'registration': 15,
+    'membership': 10,
+    'cli': 30,
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed * 1000, 'numpy' in sys.modules)
+"""
+
+
+def import_time(module, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(module=module)],
+                                capture_output=True, text=True, check=True).stdout.split()
+        best = min(best, float(output[0]))
+    return best, output[1] == 'True'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply every budget, for slow machines")
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in BUDGETS_MS.items():
+        elapsed, numpy_loaded = import_time(module, args.repeat)
+        ok = elapsed <= budget * args.scale and not numpy_loaded
+        failed = failed or not ok
+        print("%-14s %7.2f ms  budget %5.1f ms  %s%s" % (
+            module, elapsed, budget * args.scale, 'ok' if ok else 'OVER', '  (imports numpy)' if numpy_loaded else ''))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
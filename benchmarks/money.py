@@ -0,0 +1,78 @@
+"""
+Fixed-point add_vat against the float + Decimal workaround.
+
+The workaround prices with the float add_vat and fixes the drift with a Decimal quantize
+pass; the fixed-point path works on integer minor units, as Python ints and as a NumPy
+int64 array. All three results are checked to agree to the cent.
+
+Run from the repository root:
+    python -m benchmarks.money --size 1000000
+"""
+
+import argparse
+import random
+import time
+from decimal import ROUND_HALF_EVEN, Decimal
+
+from _numpy import numpy_or_none
+from lesson import add_vat
+from money import HALF_EVEN, add_vat_minor, rate, to_minor
+
+CENT = Decimal('0.01')
+
+
+def decimal_workaround(vat, prices):
+    # float add_vat, then a Decimal pass to get back to exact cents
+    return [Decimal(repr(price)).quantize(CENT, ROUND_HALF_EVEN) for price in add_vat(vat, prices)]
+
+
+def decimal_exact(vat, prices):
+    vat = Decimal(vat)
+    return [(Decimal(repr(price)) * (100 + vat) / 100).quantize(CENT, ROUND_HALF_EVEN) for price in prices]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1000000)
+    parser.add_argument('--vat', default='17.5')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    minor = [rng.randint(1, 100000) for _ in range(args.size)]
+    prices = [units / 100 for units in minor]
+    vat = float(args.vat)
+    vat_rate = rate(args.vat)
+
+    runs = [
+        ('float add_vat + Decimal', lambda: decimal_workaround(vat, prices)),
+        ('Decimal throughout', lambda: decimal_exact(args.vat, prices)),
+        ('fixed point, ints', lambda: add_vat_minor(vat_rate, minor, HALF_EVEN)),
+    ]
+    np = numpy_or_none()
+    if np is not None:
+        column = np.array(minor, dtype=np.int64)
+        runs.append(('fixed point, NumPy', lambda: add_vat_minor(vat_rate, column, HALF_EVEN)))
+
+    results = {}
+    print("%-26s %10s %14s" % ('method', 'seconds', 'items/s'))
+    for name, func in runs:
+        seconds, result = timed(func)
+        results[name] = result
+        print("%-26s %10.3f %14.0f" % (name, seconds, args.size / seconds))
+
+    exact = [to_minor(amount) for amount in results['Decimal throughout']]
+    drift = sum(1 for a, b in zip(exact, (to_minor(x) for x in results['float add_vat + Decimal'])) if a != b)
+    print("float + Decimal workaround differs from exact Decimal on %d items" % drift)
+    for name in results:
+        if name.startswith('fixed point') and list(results[name]) != exact:
+            raise AssertionError("%s differs from the exact Decimal result" % name)
+
+
+if __name__ == '__main__':
+    main()
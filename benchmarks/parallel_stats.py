@@ -0,0 +1,57 @@
+"""
+Scaling of parallel_get_stats from 1 to N worker processes.
+
+Run from the repository root:
+    python -m benchmarks.parallel_stats --students 200000 --max-workers 8
+"""
+
+import argparse
+import os
+import random
+import time
+
+from gradebook import ColumnarGradebook, parallel_get_stats
+from lesson import avg_or_zero, get_stats
+
+
+def make_grades(students, max_grades, seed=0):
+    rng = random.Random(seed)
+    return [
+        [['Student', str(i)], [round(rng.uniform(0, 100), 1) for _ in range(rng.randint(0, max_grades))]]
+        for i in range(students)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200000)
+    parser.add_argument('--max-grades', type=int, default=40)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    grades = make_grades(args.students, args.max_grades)
+    book = ColumnarGradebook.from_nested(grades)
+    records = len(book.scores)
+
+    start = time.perf_counter()
+    expected = get_stats(grades, avg=avg_or_zero)
+    serial = time.perf_counter() - start
+    print("%d students, %d grade records" % (len(book), records))
+    print("serial get_stats: %.3fs" % serial)
+
+    # speed-up against the serial get_stats, so a parallel run slower than serial shows as < 1x
+    print("%8s %10s %14s %8s" % ('workers', 'seconds', 'records/s', 'speedup'))
+    for workers in range(1, args.max_workers + 1):
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = parallel_get_stats(grades, workers=workers, fill=0.0)
+            best = min(best, time.perf_counter() - start)
+        if result != expected:
+            raise AssertionError("parallel_get_stats with %d workers differs from serial get_stats" % workers)
+        print("%8d %10.3f %14.0f %7.2fx" % (workers, best, records / best, serial / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Memory of the gradebook and catalog shapes: the lesson's lists and dicts against the
+compact records (Student, StudentStats, Product) and the columnar containers.
+
+Run from the repository root:
+    python -m benchmarks.record_memory --students 100000
+"""
+
+import argparse
+import random
+import tracemalloc
+
+from discount import catalog_columns
+from gradebook import ColumnarGradebook
+from lesson import avg_or_zero, get_stats
+from records import Product, Student, get_student_stats
+
+
+def allocated(build):
+    """
+    :return: tuple (bytes still allocated by the object build() returns, the object)
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, obj
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--grades', type=int, default=10, help="grades per student")
+    parser.add_argument('--products', type=int, default=100000)
+    args = parser.parse_args()
+
+    ColumnarGradebook.from_nested([])  # NumPy is imported on first use, keep it out of the numbers
+    rng = random.Random(0)
+    names = [('Student%d' % i, 'Surname%d' % i) for i in range(args.students)]
+    scores = [[rng.uniform(0, 100) for _ in range(args.grades)] for _ in range(args.students)]
+    skus = ['SKU%d' % i for i in range(args.products)]
+    prices = [rng.uniform(1, 100) for _ in range(args.products)]
+
+    rows = []
+    size, nested = allocated(lambda: [[list(name), list(grades)] for name, grades in zip(names, scores)])
+    rows.append(('gradebook', 'nested lists', size))
+    size, records = allocated(lambda: [Student(name, grades) for name, grades in zip(names, scores)])
+    rows.append(('gradebook', 'Student records', size))
+    size, _ = allocated(lambda: ColumnarGradebook.from_nested(records))
+    rows.append(('gradebook', 'ColumnarGradebook', size))
+
+    size, _ = allocated(lambda: get_stats(nested, avg=avg_or_zero))
+    rows.append(('get_stats output', 'nested lists', size))
+    size, _ = allocated(lambda: get_student_stats(records, avg=avg_or_zero))
+    rows.append(('get_stats output', 'StudentStats records', size))
+
+    size, products = allocated(lambda: [{'name': sku, 'price': price} for sku, price in zip(skus, prices)])
+    rows.append(('catalog', 'dicts', size))
+    size, _ = allocated(lambda: [Product(sku, price) for sku, price in zip(skus, prices)])
+    rows.append(('catalog', 'Product records', size))
+    size, _ = allocated(lambda: catalog_columns(products))
+    rows.append(('catalog', 'columns', size))
+
+    print("%-18s %-22s %14s %12s" % ('data', 'shape', 'bytes', 'per item'))
+    for data, shape, size in rows:
+        count = args.products if data == 'catalog' else args.students
+        print("%-18s %-22s %14d %12.1f" % (data, shape, size, size / count))
+    print("(catalog columns hold only the prices and the list of SKU references, "
+          "the SKU strings are shared with the dicts)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""
+EAFP (try/except) vs LBYL (if/else) cost of the lesson's functions.
+
+Every case runs over a generated input of a given size in which a given fraction of the
+items is bad (a string price, an empty grade list, a 200% discount, an invalid registration).
+For each (case, size, bad fraction) the suite records throughput, latency per item and the
+memory allocated (tracemalloc peak and block count), and saves the results as JSON.
+
+Run from the repository root:
+    python -m benchmarks.suite run --out results.json
+    python -m benchmarks.suite compare baseline.json results.json --threshold 0.10
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import lesson
+from discount import apply_discount_bulk
+from registration import validate_batch
+from vat import add_vat_batch
+
+VAT = 20
+
+
+# ---- inputs -------------------------------------------------------------------------------
+
+def make_prices(size, bad, rng):
+    return [('10' if rng.random() < bad else round(rng.uniform(0, 100), 2)) for _ in range(size)]
+
+
+def make_grades(size, bad, rng):
+    return [
+        [['Student', str(i)], [] if rng.random() < bad else [rng.choice((80.0, 90.0)) for _ in range(3)]]
+        for i in range(size)
+    ]
+
+
+def make_products(size, bad, rng):
+    products = [{'name': 'Product %d' % i, 'price': round(rng.uniform(1, 100), 2)} for i in range(size)]
+    discounts = [200 if rng.random() < bad else 25 for _ in range(size)]
+    return products, discounts
+
+
+def make_registrations(size, bad, rng):
+    records = []
+    for _ in range(size):
+        if rng.random() < bad:
+            records.append(rng.choice((('Hassan Munir', 15), ('Rehana,Soltane', 25), ('Andreea,', 14))))
+        else:
+            records.append(('Hassan,Munir', rng.randint(12, 19)))
+    return records
+
+
+# ---- cases: each takes the generated input and handles the bad items one way or another ---
+
+def add_vat_eafp(prices):
+    # whole list first, item by item only when the list comprehension fails
+    try:
+        return lesson.add_vat(VAT, prices)
+    except TypeError:
+        new_prices = []
+        for price in prices:
+            try:
+                new_prices.extend(lesson.add_vat(VAT, [price]))
+            except TypeError:
+                pass
+        return new_prices
+
+
+def add_vat_lbyl(prices):
+    return lesson.add_vat(VAT, [price for price in prices if isinstance(price, (int, float))])
+
+
+def add_vat_batch_case(prices):
+    return add_vat_batch(VAT, prices)
+
+
+def _avg_caught(avg):
+    def run(grades):
+        averages = []
+        for _, student_grades in grades:
+            try:
+                averages.append(avg(student_grades))
+            except (ZeroDivisionError, AssertionError):
+                averages.append(0.0)
+        return averages
+    return run
+
+
+def avg_lbyl(grades):
+    return [lesson.avg_plain(student_grades) if student_grades else 0.0 for _, student_grades in grades]
+
+
+def get_stats_case(grades):
+    return lesson.get_stats(grades, avg=lesson.avg_or_zero)
+
+
+def apply_discount_eafp(data):
+    products, discounts = data
+    prices = []
+    for product, discount in zip(products, discounts):
+        try:
+            prices.append(lesson.apply_discount(product, discount))
+        except AssertionError:
+            prices.append(None)
+    return prices
+
+
+def apply_discount_lbyl(data):
+    products, discounts = data
+    return [lesson.apply_discount(product, discount) if 0 <= discount <= 100 else None
+            for product, discount in zip(products, discounts)]
+
+
+def apply_discount_bulk_case(data):
+    products, discounts = data
+    return apply_discount_bulk([product['price'] for product in products], discounts)
+
+
+def validators_eafp(records):
+    valid = []
+    for i, (name, age) in enumerate(records):
+        try:
+            lesson.name_validated(name)
+            lesson.age_validated(age)
+        except (ValueError, AssertionError):
+            continue
+        valid.append(i)
+    return valid
+
+
+def validators_batch(records):
+    return validate_batch(records)
+
+
+CASES = {
+    'add_vat/eafp': (make_prices, add_vat_eafp),
+    'add_vat/lbyl': (make_prices, add_vat_lbyl),
+    'add_vat/batch': (make_prices, add_vat_batch_case),
+    'avg/plain': (make_grades, _avg_caught(lesson.avg_plain)),
+    'avg/try_except': (make_grades, _avg_caught(lesson.avg_or_zero)),
+    'avg/assert': (make_grades, _avg_caught(lesson.avg)),
+    'avg/lbyl': (make_grades, avg_lbyl),
+    'get_stats/try_except': (make_grades, get_stats_case),
+    'apply_discount/eafp': (make_products, apply_discount_eafp),
+    'apply_discount/lbyl': (make_products, apply_discount_lbyl),
+    'apply_discount/bulk': (make_products, apply_discount_bulk_case),
+    'validators/eafp': (make_registrations, validators_eafp),
+    'validators/batch': (make_registrations, validators_batch),
+}
+
+
+# ---- measuring ----------------------------------------------------------------------------
+
+def measure(func, data, size, repeat):
+    """
+    :return: dict with items_per_sec, ns_per_item (best of repeat runs), alloc_peak_bytes
+        and alloc_blocks (one extra run under tracemalloc)
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func(data)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    del result
+
+    return {
+        'items_per_sec': size / best if best else float('inf'),
+        'ns_per_item': best / size * 1e9,
+        'alloc_peak_bytes': peak,
+        'alloc_blocks': blocks,
+    }
+
+
+def run(sizes, bad_fractions, repeat, only=None, seed=0):
+    results = []
+    for name, (make_input, func) in CASES.items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        for size in sizes:
+            for bad in bad_fractions:
+                data = make_input(size, bad, random.Random(seed))
+                row = {'case': name, 'size': size, 'bad_fraction': bad}
+                row.update(measure(func, data, size, repeat))
+                results.append(row)
+                print("%-22s size=%-8d bad=%-5g %12.0f items/s %9.1f ns/item %10d B peak" % (
+                    name, size, bad, row['items_per_sec'], row['ns_per_item'], row['alloc_peak_bytes']))
+    return {
+        'meta': {
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Print the change of every (case, size, bad fraction) present in both result files.
+    :return: list of regressions, rows whose ns_per_item grew by more than threshold
+    """
+    key = lambda row: (row['case'], row['size'], row['bad_fraction'])
+    old = {key(row): row for row in baseline['results']}
+    regressions = []
+    print("%-22s %8s %6s %12s %12s %8s" % ('case', 'size', 'bad', 'old ns', 'new ns', 'change'))
+    for row in current['results']:
+        before = old.get(key(row))
+        if before is None:
+            continue
+        change = row['ns_per_item'] / before['ns_per_item'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(row)
+        print("%-22s %8d %6g %12.1f %12.1f %+7.1f%%%s" % (
+            row['case'], row['size'], row['bad_fraction'], before['ns_per_item'], row['ns_per_item'],
+            change * 100, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the suite and save the results as JSON")
+    run_parser.add_argument('--out', default='bench_results.json')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000])
+    run_parser.add_argument('--bad', type=float, nargs='+', default=[0.0, 0.01, 0.1, 0.5])
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--only', nargs='+', help="run only cases containing one of these strings")
+    run_parser.add_argument('--seed', type=int, default=0)
+
+    compare_parser = commands.add_parser('compare', help="diff two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="slowdown (as a fraction) reported as a regression")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        report = run(args.sizes, args.bad, args.repeat, args.only, args.seed)
+        with open(args.out, 'w') as file:
+            json.dump(report, file, indent=2)
+        print("Results saved to %s" % args.out)
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+        if compare(baseline, current, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Cost of the trace points in add_vat, get_stats and validate_batch.
+
+For each function this compares an untraced copy of the loop (baseline), the library
+function with its trace point disabled, and with the trace point enabled (sampled, and
+recording every item).
+
+Run from the repository root:
+    python -m benchmarks.tracing_overhead --size 100000
+"""
+
+import argparse
+import gc
+import time
+
+import lesson
+import registration
+from tracing import tracer
+
+
+def baseline_add_vat(vat, prices):
+    return [(price / 100 * vat) + price for price in prices]
+
+
+def baseline_get_stats(grades, avg=lesson.avg_or_zero):
+    new_grades = []
+    for i in grades:
+        new_grades.append([i[0], i[1], avg(i[1])])
+    return new_grades
+
+
+def best_of(func, repeat):
+    func()  # warm-up
+    best = float('inf')
+    gc.disable()  # collections triggered by the result lists would swamp the difference
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--sample', type=int, default=100, help="1 in N for the sampled run")
+    args = parser.parse_args()
+
+    prices = [float(i % 100) for i in range(args.size)]
+    grades = [[['Student', str(i)], [80.0, 90.0, 90.0]] for i in range(args.size)]
+    records = [('Hassan,Munir', 12 + i % 8) for i in range(args.size)]
+
+    cases = [
+        ('add_vat', lambda: baseline_add_vat(20, prices), lambda: lesson.add_vat(20, prices)),
+        ('get_stats', lambda: baseline_get_stats(grades), lambda: lesson.get_stats(grades, avg=lesson.avg_or_zero)),
+        ('validate_batch', None, lambda: registration.validate_batch(records)),
+    ]
+
+    print("%-15s %-22s %10s %10s" % ('function', 'mode', 'ns/item', 'overhead'))
+    for name, baseline, traced in cases:
+        tracer.disable()
+        reference = best_of(baseline or traced, args.repeat)
+        runs = [('baseline' if baseline else 'disabled (reference)', reference)]
+        if baseline:
+            runs.append(('disabled', best_of(traced, args.repeat)))
+        tracer.enable(name, every=args.sample)
+        runs.append(('sampled 1/%d' % args.sample, best_of(traced, args.repeat)))
+        tracer.enable(name)
+        runs.append(('every item', best_of(traced, args.repeat)))
+        tracer.disable()
+        tracer.buffer.clear()
+
+        for mode, seconds in runs:
+            print("%-15s %-22s %10.1f %+9.1f%%" % (
+                name, mode, seconds / args.size * 1e9, (seconds / reference - 1) * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Command line entry point for batch jobs.
+
+    python cli.py vat --vat 20 prices.csv --column 1 --header --rejects rejects.csv
+    python cli.py stats grades.json --fill 0.0 --workers 4
+    python cli.py stats cohort.gbk --fill 0.0
+    python cli.py discount catalog.csv --discount 25 --header
+    python cli.py register sign_ups.csv --file registration_file.txt
+
+Input files may be '-' for stdin. Every subcommand imports what it needs when it runs, so
+starting the CLI stays cheap.
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+
+def _open_input(path):
+    # '-' is stdin, opened again without closefd so leaving a with block does not close it
+    if path == '-':
+        return open(sys.stdin.fileno(), newline='', encoding='utf-8', closefd=False)
+    return open(path, newline='', encoding='utf-8')
+
+
+def run_vat(args):
+    from vat import stream_add_vat
+
+    rejects = open(args.rejects, 'w', encoding='utf-8') if args.rejects else None
+    source = _open_input(args.prices)
+    try:
+        out = sys.stdout
+        for price in stream_add_vat(args.vat, source, chunk_size=args.chunk_size, rejects=rejects,
+                                    column=args.column, header=args.header):
+            out.write("%r\n" % price)
+    finally:
+        if rejects is not None:
+            rejects.close()
+        source.close()
+    return 0
+
+
+def run_stats(args):
+    if args.grades.endswith('.gbk'):
+        from gradebook_file import GradebookFile
+        with GradebookFile(args.grades) as gradebook:
+            stats = gradebook.get_stats(args.fill)
+    else:
+        with _open_input(args.grades) as file:
+            grades = json.load(file)
+        # the averages are the same for any number of workers
+        from gradebook import parallel_get_stats
+        stats = parallel_get_stats(grades, workers=args.workers, fill=args.fill)
+    # NaN is not valid JSON, students with no grades get null unless --fill is given
+    stats = [[name, scores, None if average != average else average] for name, scores, average in stats]
+    json.dump(stats, sys.stdout)
+    sys.stdout.write('\n')
+    return 0
+
+
+def _price(row, column):
+    try:
+        return float(row[column])
+    except (IndexError, ValueError):
+        return float('nan')
+
+
+def run_discount(args):
+    from discount import apply_discount_bulk
+
+    with _open_input(args.catalog) as file:
+        rows = list(csv.reader(file))
+    if args.header:
+        rows = rows[1:]
+    skus = [row[args.sku_column] if len(row) > args.sku_column else '' for row in rows]
+    prices = [_price(row, args.price_column) for row in rows]
+
+    # a malformed price goes through as NaN, which the batch reports with the offending items
+    batch = apply_discount_bulk(prices, args.discount)
+    writer = csv.writer(sys.stdout)
+    for sku, price, ok in zip(skus, batch.prices, batch.valid):
+        if ok:
+            writer.writerow([sku, "%.2f" % price])
+    for i in batch.offending:
+        if prices[i] != prices[i]:
+            raw = rows[i][args.price_column] if len(rows[i]) > args.price_column else ''
+            sys.stderr.write("Row %d: Malformed price %r for %s\n" % (i + 1 + args.header, raw, skus[i]))
+        else:
+            sys.stderr.write("Discount out of range for %s\n" % skus[i])
+    return 1 if batch.offending else 0
+
+
+def run_register(args):
+    from registration_import import import_registrations
+
+    def reject(line_no, name, age, reason):
+        sys.stderr.write("Row %d: Invalid input: %s\n" % (line_no, reason))
+
+    with _open_input(args.sign_ups) as file:
+        report = import_registrations(file, args.file, workers=args.workers, processes=args.processes,
+                                      header=args.header, rejects=reject)
+    print("%d registered, %d rejected, %d already registered (%.0f rows/s)" % (
+        report.imported, report.rejected, report.skipped, report.rows_per_sec))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    vat = commands.add_parser('vat', help="add vat to a price file, one price per output line")
+    vat.add_argument('prices', help="line or CSV file with net prices, '-' for stdin")
+    vat.add_argument('--vat', type=float, required=True, help="vat percentage")
+    vat.add_argument('--column', type=int, help="CSV column of the price; one price per line if omitted")
+    vat.add_argument('--header', action='store_true', help="skip the first line")
+    vat.add_argument('--rejects', help="file receiving '<line>,<value>' for malformed rows")
+    vat.add_argument('--chunk-size', type=int, default=65536)
+    vat.set_defaults(run=run_vat)
+
+    stats = commands.add_parser('stats', help="averages of a JSON gradebook in the Script.py shape")
+    stats.add_argument('grades', help="JSON file, [[[first, last], [scores...]], ...], '-' for stdin, or a .gbk file")
+    stats.add_argument('--fill', type=float, default=float('nan'), help="average for students with no grades")
+    stats.add_argument('--workers', type=int, default=1, help="worker processes")
+    stats.set_defaults(run=run_stats)
+
+    discount = commands.add_parser('discount', help="discount a CSV catalog")
+    discount.add_argument('catalog', help="CSV file with SKU and price columns, '-' for stdin")
+    discount.add_argument('--discount', type=float, required=True, help="discount in percent")
+    discount.add_argument('--sku-column', type=int, default=0)
+    discount.add_argument('--price-column', type=int, default=1)
+    discount.add_argument('--header', action='store_true', help="skip the first line")
+    discount.set_defaults(run=run_discount)
+
+    register = commands.add_parser('register', help="validate and register a CSV of sign-ups")
+    register.add_argument('sign_ups', help="CSV file with '\"name,surname\",age' rows, '-' for stdin")
+    register.add_argument('--file', default="registration_file.txt", help="registration file to append to")
+    register.add_argument('--header', action='store_true', help="skip the first line")
+    register.add_argument('--workers', type=int, default=4, help="validation workers")
+    register.add_argument('--processes', action='store_true', help="validate in worker processes instead of threads")
+    register.set_defaults(run=run_register)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
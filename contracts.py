@@ -0,0 +1,175 @@
+"""
+Contract checks to use instead of assert for the lesson's internal invariants.
+
+The lesson's assert checks (the price range of apply_discount, avg on an empty list, ...)
+disappear under python -O, so production either pays for every check or has none. A
+contract is a named check with a mode that can be set per contract, at run time:
+
+- 'always': checked on every call, also under python -O
+- 'sampled': checked on 1 in every N calls, and/or for at most budget seconds of checking
+  per window seconds of wall time
+- 'off': not checked; the call site costs one attribute lookup
+
+A call site decrements contract.countdown and only calls the contract when it reaches zero,
+so 1-in-N sampling skips the other calls without a function call. A contract whose time
+budget is used up sets the countdown to skip the rest of its window the same way.
+
+Violations are counted per contract, and raise ContractViolation (an AssertionError, like
+the asserts it replaces) unless the contract is set to only count them.
+
+Contracts are for the code's own promises. Checks of what users type in (ages, names,
+authorization) are input validation: they raise ValueError / AuthorizationError on every
+call and have no mode.
+
+    from contracts import contracts
+    contracts.set_mode('apply_discount', 'sampled', every=100, action='count')
+    contracts.set_mode('avg', 'sampled', budget=0.001)  # at most 1ms of checks per second
+    contracts.violations()  # --> {'apply_discount': 0, 'avg': 0, ...}
+"""
+
+import time
+
+ALWAYS = 'always'
+SAMPLED = 'sampled'
+OFF = 'off'
+MODES = (ALWAYS, SAMPLED, OFF)
+ACTIONS = ('raise', 'count')
+
+
+class ContractViolation(AssertionError):
+    """
+    Raised when a contract check fails.
+    """
+
+
+class Contract:
+    """
+    A named check. Call it with the values to check, when contract.on is True and the
+    countdown has run out:
+
+        if contract.on:
+            contract.countdown -= 1
+            if contract.countdown <= 0:
+                contract(values...)
+    """
+    __slots__ = ('name', 'check', 'message', 'mode', 'on', 'countdown', 'every', 'budget', 'window', 'action',
+                 'checked', 'violations', '_spent', '_window_start', '_window_calls')
+
+    def __init__(self, name, check, message):
+        self.name = name
+        self.check = check
+        self.message = message
+        self.mode = ALWAYS
+        self.on = True
+        self.countdown = 1
+        self.every = 1
+        self.budget = None
+        self.window = 1.0
+        self.action = 'raise'
+        self.checked = 0
+        self.violations = 0
+        self._spent = 0.0
+        self._window_start = 0.0
+        self._window_calls = 0
+
+    def __call__(self, *values):
+        self.countdown = self.every
+        if self.budget is None:
+            ok = self.check(*values)
+        else:
+            start = time.perf_counter()
+            if start - self._window_start >= self.window:
+                self._window_start = start
+                self._spent = 0.0
+                self._window_calls = 0
+            elif self._spent >= self.budget:
+                self._skip_window(start)
+                return
+            self._window_calls += 1
+            ok = self.check(*values)
+            self._spent += time.perf_counter() - start
+        self.checked += 1
+        if not ok:
+            self.violations += 1
+            if self.action == 'raise':
+                raise ContractViolation(self.message)
+
+    def _skip_window(self, now):
+        # budget used up: skip, at the call site, about as many calls as the rest of the window
+        # will see at the rate seen so far, instead of a call and a clock read for each of them
+        elapsed = now - self._window_start
+        remaining = self._window_start + self.window - now
+        if elapsed > 0 and remaining > 0:
+            self.countdown = max(1, int(self._window_calls / elapsed * remaining))
+
+
+class Contracts:
+    def __init__(self):
+        self._contracts = {}
+
+    def contract(self, name, check, message):
+        """
+        :param name: str, contract name, usually the function it belongs to
+        :param check: function returning True when the contract holds for the given values
+        :param message: str, message of the ContractViolation
+        :return: the Contract, checked on every call until set_mode says otherwise
+        """
+        if name in self._contracts:
+            raise ValueError("Contract %r already exists" % (name,))
+        contract = self._contracts[name] = Contract(name, check, message)
+        return contract
+
+    def get(self, name):
+        try:
+            return self._contracts[name]
+        except KeyError:
+            raise KeyError("Unknown contract %r" % (name,)) from None
+
+    def set_mode(self, name, mode, every=1, budget=None, window=1.0, action='raise'):
+        """
+        :param name: str, contract name, or None for every contract
+        :param mode: 'always', 'sampled' or 'off'
+        :param every: int, 'sampled' only: check 1 in every N calls
+        :param budget: float, 'sampled' only: seconds of checking allowed per window
+        :param window: float, seconds of wall time the budget applies to
+        :param action: 'raise' or 'count', what a violation does
+        """
+        if mode not in MODES:
+            raise ValueError("mode must be one of %s" % ', '.join(MODES))
+        if action not in ACTIONS:
+            raise ValueError("action must be one of %s" % ', '.join(ACTIONS))
+        if every < 1:
+            raise ValueError("every must be a positive number")
+        if mode == SAMPLED and every == 1 and budget is None:
+            raise ValueError("sampled mode needs every > 1 or a budget")
+        for contract in ([self.get(name)] if name is not None else self._contracts.values()):
+            contract.mode = mode
+            contract.on = mode != OFF
+            contract.every = every if mode == SAMPLED else 1
+            contract.budget = budget if mode == SAMPLED else None
+            contract.window = window
+            contract.action = action
+            contract.countdown = contract.every
+            contract._spent = 0.0
+            contract._window_start = 0.0
+            contract._window_calls = 0
+
+    def violations(self):
+        """
+        :return: dict, contract name -> violations counted since start or the last reset()
+        """
+        return {name: contract.violations for name, contract in self._contracts.items()}
+
+    def snapshot(self):
+        """
+        :return: dict, contract name -> {'mode', 'checked', 'violations'}
+        """
+        return {name: {'mode': contract.mode, 'checked': contract.checked, 'violations': contract.violations}
+                for name, contract in self._contracts.items()}
+
+    def reset(self):
+        for contract in self._contracts.values():
+            contract.checked = contract.violations = 0
+
+
+contracts = Contracts()
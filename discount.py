@@ -0,0 +1,110 @@
+"""
+Bulk version of apply_discount from Script.py.
+
+apply_discount(product, discount) prices one product dict at a time and checks its
+0 <= price <= product['price'] invariant with an assert, so one out-of-range discount
+stops a whole catalog reprice. Here the catalog is priced in one vectorised pass (rounded
+with round() itself, so every price matches apply_discount), the invariant is checked for
+every item at once and the offending SKUs are returned.
+"""
+
+from array import array
+from collections import namedtuple
+from numbers import Real
+
+from _numpy import numpy_or_none
+
+# prices: discounted prices (NaN where the invariant does not hold)
+# valid: mask, True/1 where 0 <= new price <= old price
+# offending: SKUs (or indices when no SKUs were given) that broke the invariant
+DiscountBatch = namedtuple('DiscountBatch', ['prices', 'valid', 'offending'])
+
+
+def catalog_columns(products, sku_key='name'):
+    """
+    Turn a list of product dicts (the Script.py shape) into columns.
+    :param products: list of dict obj, item spec including price
+    :param sku_key: str, key identifying the product
+    :return: tuple (skus list, float64 buffer of prices)
+    """
+    np = numpy_or_none()
+    skus = [product[sku_key] for product in products]
+    prices = array('d', (product['price'] for product in products))
+    if np is not None:
+        prices = np.frombuffer(prices, dtype=np.float64)
+    return skus, prices
+
+
+def _offending(rejected, skus):
+    if skus is None:
+        return list(rejected)
+    return [skus[i] for i in rejected]
+
+
+def _apply_discount_numpy(prices, discount, skus, out):
+    np = numpy_or_none()
+    prices = np.asarray(prices, dtype=np.float64)
+    discount = np.asarray(discount, dtype=np.float64)
+    if out is None:
+        out = np.empty(len(prices), dtype=np.float64)
+    dst = np.frombuffer(out, dtype=np.float64) if isinstance(out, array) else out
+    if np.shares_memory(dst, prices):
+        prices = prices.copy()  # the old prices are still needed for the invariant check
+
+    # same formula as apply_discount: round(price * (1.0 - (discount / 100)), 2). np.round
+    # scales by 100 and rounds, which is a cent off round() on some prices, so the products
+    # are vectorised and the rounding is round() itself, item by item
+    raw = prices * (1.0 - (discount / 100))
+    dst[:] = [round(value, 2) for value in raw.tolist()]
+    valid = (dst >= 0) & (dst <= prices)  # False for NaN as well
+    rejected = np.flatnonzero(~valid)
+    dst[rejected] = np.nan
+    return DiscountBatch(out, valid, _offending(rejected.tolist(), skus))
+
+
+def _apply_discount_python(prices, discount, skus, out):
+    if out is None:
+        out = array('d', bytes(8 * len(prices)))
+    per_item = not isinstance(discount, Real)
+    valid = bytearray(len(prices))
+    rejected = []
+    for i, price in enumerate(prices):
+        new_price = round(price * (1.0 - ((discount[i] if per_item else discount) / 100)), 2)
+        if 0 <= new_price <= price:
+            out[i] = new_price
+            valid[i] = 1
+        else:
+            out[i] = float('nan')
+            rejected.append(i)
+    return DiscountBatch(out, valid, _offending(rejected, skus))
+
+
+def apply_discount_bulk(prices, discount, skus=None, out=None):
+    """
+    Add a discount to every price of a catalog and check the price invariant in bulk.
+    :param prices: sequence, ndarray or array('d') of current prices
+    :param discount: float discount in percent, or one discount per item
+    :param skus: optional sequence of SKUs aligned with prices, used to report offenders
+    :param out: optional ndarray or array('d') of the same length to write the results into
+    :return: DiscountBatch(prices, valid, offending)
+    Items whose new price falls outside 0 <= new price <= old price are set to NaN and
+    reported, the rest of the catalog is priced as usual.
+    """
+    np = numpy_or_none()
+    if out is not None and len(out) != len(prices):
+        raise ValueError("Output buffer has %d items, expected %d" % (len(out), len(prices)))
+    if not isinstance(discount, Real) and len(discount) != len(prices):
+        raise ValueError("Got %d discounts for %d prices" % (len(discount), len(prices)))
+    if skus is not None and len(skus) != len(prices):
+        raise ValueError("Got %d SKUs for %d prices" % (len(skus), len(prices)))
+
+    if np is not None:
+        return _apply_discount_numpy(prices, discount, skus, out)
+    return _apply_discount_python(prices, discount, skus, out)
+
+
+# trainers = {'name': 'Running Trainers', 'price': 79.99}
+# socks = {'name': 'Running Socks', 'price': 9.99}
+# skus, prices = catalog_columns([trainers, socks])
+# apply_discount_bulk(prices, [25, 200], skus=skus)
+# --> prices [59.99, nan], offending ['Running Socks']
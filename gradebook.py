@@ -0,0 +1,313 @@
+"""
+Columnar version of the grades list from Script.py.
+
+get_stats(grades) walks the nested [[first, last], [scores...]] list and calls avg once per
+student, which raises ZeroDivisionError (or AssertionError) for a student with no grades.
+Here the whole cohort is kept in three flat columns and every average comes from one
+segmented reduction, with a fill value for students with no grades instead of an exception.
+"""
+
+import os
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+from _numpy import numpy_or_none
+
+
+class ColumnarGradebook:
+    """
+    Cohort stored as columns:
+    - names: list of [first, last] name pairs, one per student
+    - scores: float64 buffer with the grades of all students, one after the other
+    - offsets: int buffer of len(names) + 1, student i owns scores[offsets[i]:offsets[i + 1]]
+    """
+
+    def __init__(self, names, scores, offsets):
+        if len(offsets) != len(names) + 1:
+            raise ValueError("Expected %d offsets, got %d" % (len(names) + 1, len(offsets)))
+        if offsets[0] != 0 or offsets[-1] != len(scores):
+            raise ValueError("Offsets do not cover the score buffer")
+        self.names = names
+        self.scores = scores
+        self.offsets = offsets
+
+    @classmethod
+    def from_nested(cls, grades):
+        """
+        Build the columns from the nested list shape used in Script.py.
+        :param grades: list, [[[first, last], [scores...]], ...]
+        :return: ColumnarGradebook
+        """
+        np = numpy_or_none()
+        names = []
+        scores = array('d')
+        offsets = array('q', [0])
+        for name, student_grades in grades:
+            names.append(name)
+            scores.extend(student_grades)
+            offsets.append(len(scores))
+        if np is not None:
+            return cls(names, np.frombuffer(scores, dtype=np.float64), np.frombuffer(offsets, dtype=np.int64))
+        return cls(names, scores, offsets)
+
+    def __len__(self):
+        return len(self.names)
+
+    def grades_of(self, i):
+        return self.scores[self.offsets[i]:self.offsets[i + 1]]
+
+    def counts(self):
+        np = numpy_or_none()
+        if np is not None:
+            return np.diff(self.offsets)
+        return array('q', (self.offsets[i + 1] - self.offsets[i] for i in range(len(self))))
+
+    def sums(self):
+        """
+        :return: float64 buffer with the sum of every student's grades, 0.0 with no grades
+        """
+        np = numpy_or_none()
+        if np is None:
+            return array('d', (sum(self.scores[start:end]) for start, end in zip(self.offsets, self.offsets[1:])))
+
+        sums = np.zeros(len(self), dtype=np.float64)
+        has_grades = self.counts() > 0
+        if has_grades.any():
+            # reduceat needs strictly increasing starts, so empty students are left out
+            sums[has_grades] = np.add.reduceat(self.scores, self.offsets[:-1][has_grades])
+        return sums
+
+    def averages(self, fill=float('nan')):
+        """
+        Average grade of every student in one segmented reduction.
+        :param fill: float, value used for students with no grades (NaN by default)
+        :return: float64 buffer with one average per student
+        """
+        np = numpy_or_none()
+        if np is None:
+            return self._averages_python(fill)
+
+        counts = self.counts()
+        means = np.full(len(self), fill, dtype=np.float64)
+        np.divide(self.sums(), counts, out=means, where=counts > 0)
+        return means
+
+    def _averages_python(self, fill):
+        return _segment_averages(self.scores, self.offsets, fill)
+
+    def get_stats(self, fill=float('nan')):
+        """
+        Same list shape as get_stats in Script.py: [[[first, last], [scores...], average], ...]
+        :param fill: float, average used for students with no grades
+        """
+        means = self.averages(fill)
+        return [[self.names[i], self.grades_of(i).tolist(), float(means[i])] for i in range(len(self))]
+
+
+# grades = [
+#     [['Hassan', 'Munir'], [90.0, 80.0, 90.0]],
+#     [['Rehana', 'Soltane'], [80.0, 90.0, 90.0]],
+#     [['Andreea', 'Avramescu'], []]
+# ]
+# ColumnarGradebook.from_nested(grades).averages(fill=0.0)  # --> [86.67, 86.67, 0.0]
+
+
+class _RunningStats:
+    # count and sum for the average, plus Welford's mean / M2 when variance is tracked
+    __slots__ = ('count', 'total', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, grade, track_variance):
+        self.count += 1
+        self.total += grade
+        if track_variance:
+            delta = grade - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (grade - self.mean)
+
+    def discard(self, grade, track_variance):
+        self.count -= 1
+        if not self.count:
+            self.total = self.mean = self.m2 = 0.0
+            return
+        self.total -= grade
+        if track_variance:
+            delta = grade - self.mean
+            self.mean -= delta / self.count
+            self.m2 = max(self.m2 - delta * (grade - self.mean), 0.0)
+
+
+class IncrementalGradebook:
+    """
+    Gradebook that keeps a running count and sum per student, so adding, changing or
+    removing a grade updates the stats in O(1) instead of calling get_stats all over again.
+    The grades themselves stay a list in the order they came in: removing any grade but the
+    last one also shifts the grades after it (see remove).
+    With track_variance=True it also keeps a running variance (Welford's method).
+    """
+
+    def __init__(self, grades=None, track_variance=False):
+        """
+        :param grades: optional list in the Script.py shape, [[[first, last], [scores...]], ...]
+        :param track_variance: bool, keep a running variance per student
+        """
+        self.track_variance = track_variance
+        self._students = {}  # (first, last) -> [name, grades, _RunningStats], insertion ordered
+        for name, student_grades in grades or []:
+            self.add_student(name)
+            for grade in student_grades:
+                self.append(name, grade)
+
+    def _entry(self, name):
+        try:
+            return self._students[tuple(name)]
+        except KeyError:
+            raise KeyError("Unknown student: %s" % ' '.join(name)) from None
+
+    def add_student(self, name):
+        """
+        :param name: list, [first, last]; adding an existing student does nothing
+        """
+        self._students.setdefault(tuple(name), [list(name), [], _RunningStats()])
+
+    def append(self, name, grade):
+        entry = self._entry(name)
+        entry[1].append(grade)
+        entry[2].add(grade, self.track_variance)
+
+    def update(self, name, index, grade):
+        """
+        Replace the grade at the given position.
+        """
+        entry = self._entry(name)
+        old = entry[1][index]
+        entry[1][index] = grade
+        entry[2].discard(old, self.track_variance)
+        entry[2].add(grade, self.track_variance)
+
+    def remove(self, name, index=-1):
+        """
+        Remove the grade at the given position (the last one by default).
+        The stats update is O(1); the grade list is a Python list, so removing the last grade
+        is O(1) and removing grade i moves the ones after it, O(len(grades) - i).
+        :return: float, the removed grade
+        """
+        entry = self._entry(name)
+        grade = entry[1].pop(index)
+        entry[2].discard(grade, self.track_variance)
+        return grade
+
+    def average(self, name, fill=float('nan')):
+        """
+        :param fill: float, value returned for a student with no grades
+        """
+        stats = self._entry(name)[2]
+        return stats.total / stats.count if stats.count else fill
+
+    def variance(self, name, sample=False):
+        """
+        :param sample: bool, sample variance (n - 1) instead of population variance (n)
+        :return: float, NaN when there are not enough grades
+        """
+        if not self.track_variance:
+            raise ValueError("Variance is not tracked, create the gradebook with track_variance=True")
+        stats = self._entry(name)[2]
+        count = stats.count - 1 if sample else stats.count
+        return stats.m2 / count if count > 0 else float('nan')
+
+    def __len__(self):
+        return len(self._students)
+
+    def get_stats(self, fill=float('nan')):
+        """
+        Snapshot in the same list shape as get_stats in Script.py.
+        :param fill: float, average used for students with no grades
+        :return: list, [[[first, last], [scores...], average], ...]
+        """
+        return [
+            [list(name), list(student_grades), stats.total / stats.count if stats.count else fill]
+            for name, student_grades, stats in self._students.values()
+        ]
+
+
+def _segment_averages(scores, offsets, fill):
+    # same arithmetic as avg in Script.py: sum(grades) / len(grades), student by student
+    means = array('d')
+    for start, end in zip(offsets, offsets[1:]):
+        means.append(sum(scores[start:end]) / (end - start) if end > start else fill)
+    return means
+
+
+def _shard_worker(scores, offsets, fill):
+    # runs in a worker process; shards travel as raw float64 / int64 bytes, not nested lists.
+    # offsets are the cohort's own, the shard's scores start at offsets[0]
+    offsets = array('q', offsets)
+    base = offsets[0]
+    return _segment_averages(array('d', scores), array('q', (offset - base for offset in offsets)), fill).tobytes()
+
+
+def _pack_scores(grade_lists):
+    # the grades of a shard of the nested shape as one float64 buffer
+    scores = array('d')
+    for grades in grade_lists:
+        scores.extend(grades)
+    return scores.tobytes()
+
+
+def _shard_bounds(offsets, shards):
+    # split students into contiguous shards holding roughly the same number of grades
+    total = offsets[-1]
+    bounds = [0]
+    for k in range(1, shards):
+        student = bisect_left(offsets, total * k // shards, lo=bounds[-1], hi=len(offsets) - 1)
+        if student > bounds[-1]:
+            bounds.append(student)
+    if bounds[-1] != len(offsets) - 1:
+        bounds.append(len(offsets) - 1)
+    return list(zip(bounds, bounds[1:]))
+
+
+def parallel_get_stats(grades, workers=None, fill=float('nan'), shards_per_worker=4):
+    """
+    get_stats over a process pool: the cohort is split in contiguous shards, every worker
+    averages its shards and the partial results are merged back in order.
+    :param grades: list in the Script.py shape or a ColumnarGradebook
+    :param workers: int, number of worker processes (os.cpu_count() by default); the pool
+        is used with one worker as well
+    :param fill: float, average used for students with no grades (0.0 matches the try/except avg)
+    :param shards_per_worker: int, shards handed to each worker, to even out the load
+    :return: list, [[[first, last], [scores...], average], ...] identical to the serial get_stats
+    """
+    from concurrent.futures import ProcessPoolExecutor  # heavy import, only needed here
+
+    workers = workers or os.cpu_count() or 1
+    if isinstance(grades, ColumnarGradebook):
+        # slices of the columns go to the workers as they are, no list of the whole column
+        book = grades
+        offsets = book.offsets
+        bounds = _shard_bounds(offsets, workers * shards_per_worker)
+        scores = [book.scores[offsets[first]:offsets[last]].tobytes() for first, last in bounds]
+    else:
+        grade_lists = [student_grades for _, student_grades in grades]
+        offsets = array('q', [0])
+        offsets.extend(accumulate(map(len, grade_lists)))
+        bounds = _shard_bounds(offsets, workers * shards_per_worker)
+        scores = [_pack_scores(grade_lists[first:last]) for first, last in bounds]
+    shard_offsets = [offsets[first:last + 1].tobytes() for first, last in bounds]
+
+    means = array('d')
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_shard_worker, scores, shard_offsets, [fill] * len(bounds)):
+            means.frombytes(part)
+
+    if isinstance(grades, ColumnarGradebook):
+        return [[book.names[i], book.grades_of(i).tolist(), means[i]] for i in range(len(book))]
+    # the name and grade list objects are reused as they are, like get_stats does; only the
+    # averages come back from the workers
+    return [[name, student_grades, mean] for (name, student_grades), mean in zip(grades, means)]
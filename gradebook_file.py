@@ -0,0 +1,285 @@
+"""
+Binary gradebook file, loaded with mmap.
+
+Script.py defines the gradebook as a Python literal, and a real cohort read from JSON or CSV
+takes longer to parse than get_stats takes to run. A .gbk file holds the ColumnarGradebook
+columns as they are in memory, so opening it maps the file and wraps the columns in place:
+no parsing and no copy of the scores. Grades come in terms; each term is appended at the end
+of the file without rewriting what is already there.
+
+Layout, all integers int64 and every block 8-byte aligned:
+
+    header      magic 'GRADEBK1', version, byte order, students, terms, name table size,
+                committed size (64 bytes)
+    names       students + 1 offsets into the name table, then the name table: the UTF-8
+                names, first and last name separated by '\\x1f'
+    term        magic 'GBTERM1\\0', number of scores, then students + 1 offsets and the
+                float64 scores (student i owns scores[offsets[i]:offsets[i + 1]])
+    term ...
+
+The header's committed size is written last, so a term interrupted half-way is ignored and
+overwritten by the next append.
+
+    write_gradebook('cohort.gbk', grades)
+    append_term('cohort.gbk', spring_grades)
+    with GradebookFile('cohort.gbk') as gradebook:
+        gradebook.get_stats(fill=0.0)        # all terms
+        get_stats(gradebook.rows(term=0))    # lesson.get_stats, on views of the mapped scores
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from _numpy import numpy_or_none
+from gradebook import ColumnarGradebook
+
+MAGIC = b'GRADEBK1'
+TERM_MAGIC = b'GBTERM1\0'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQQQ')  # magic, version, byte order, students, terms, names size, committed size
+HEADER_SIZE = 64
+TERM_HEADER = struct.Struct('<8sQ')  # magic, number of scores
+NAME_SEPARATOR = '\x1f'
+BYTE_ORDERS = {'little': 0, 'big': 1}
+
+
+def _padding(size):
+    return b'\0' * (-size % 8)
+
+
+def _encode_names(names):
+    table = bytearray()
+    offsets = array('q', [0])
+    for name in names:
+        table += NAME_SEPARATOR.join(name).encode('utf-8')
+        offsets.append(len(table))
+    return offsets.tobytes() + bytes(table) + _padding(len(table)), len(table)
+
+
+def _encode_term(grades_per_student):
+    # grades_per_student: one iterable of floats per student, in file order
+    scores = array('d')
+    offsets = array('q', [0])
+    for student_grades in grades_per_student:
+        scores.extend(student_grades)
+        offsets.append(len(scores))
+    return TERM_HEADER.pack(TERM_MAGIC, len(scores)) + offsets.tobytes() + scores.tobytes()
+
+
+def _header(students, terms, names_size, committed):
+    header = HEADER.pack(MAGIC, VERSION, BYTE_ORDERS[sys.byteorder], students, terms, names_size, committed)
+    return header + b'\0' * (HEADER_SIZE - HEADER.size)
+
+
+def write_gradebook(path, grades):
+    """
+    Write a gradebook in the nested list shape as a .gbk file with one term.
+    :param path: str, file to create (replaced if it exists)
+    :param grades: list, [[[first, last], [scores...]], ...]
+    """
+    names = [name for name, _ in grades]
+    name_block, names_size = _encode_names(names)
+    term = _encode_term(student_grades for _, student_grades in grades)
+    committed = HEADER_SIZE + len(name_block) + len(term)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(_header(len(names), 1, names_size, committed))
+        file.write(name_block)
+        file.write(term)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def _read_header(data, size):
+    # data: at least the first HEADER_SIZE bytes; size: file size
+    if size < HEADER_SIZE:
+        raise ValueError("Not a gradebook file: too short")
+    magic, version, byte_order, students, terms, names_size, committed = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a gradebook file")
+    if version != VERSION:
+        raise ValueError("Unsupported gradebook version %d" % version)
+    if byte_order != BYTE_ORDERS[sys.byteorder]:
+        raise ValueError("Gradebook written on a machine with the other byte order")
+    if committed > size:
+        raise ValueError("Gradebook file is truncated")
+    return students, terms, names_size, committed
+
+
+def _read_names(data, students, names_size):
+    start = HEADER_SIZE + (students + 1) * 8
+    offsets = array('q')
+    offsets.frombytes(data[HEADER_SIZE:start])
+    table = data[start:start + names_size].decode('utf-8')
+    names = [table[begin:end].split(NAME_SEPARATOR) for begin, end in zip(offsets, offsets[1:])]
+    return names, start + names_size + len(_padding(names_size))
+
+
+def append_term(path, grades):
+    """
+    Append a term of grades to a .gbk file.
+    :param grades: list in the nested shape, [[[first, last], [scores...]], ...]; students
+        missing from it get no grades for the term
+    Raises ValueError for a student who is not in the file.
+    """
+    with open(path, 'r+b') as file:
+        head = file.read(HEADER_SIZE)
+        students, terms, names_size, committed = _read_header(head, os.fstat(file.fileno()).st_size)
+        names, _ = _read_names(head + file.read((students + 1) * 8 + names_size), students, names_size)
+        index = {tuple(name): i for i, name in enumerate(names)}
+        per_student = [[] for _ in range(students)]
+        for name, student_grades in grades:
+            i = index.get(tuple(name))
+            if i is None:
+                raise ValueError("%s is not in the gradebook" % ' '.join(name))
+            per_student[i].extend(student_grades)
+        term = _encode_term(per_student)
+
+        # the term goes after the committed size, then the header makes it visible
+        file.seek(committed)
+        file.truncate()
+        file.write(term)
+        file.flush()
+        os.fsync(file.fileno())
+        file.seek(0)
+        file.write(_header(students, terms + 1, names_size, committed + len(term)))
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _average(grades, fill):
+    # avg from Script.py, on a list of Python floats so the sum is the one get_stats gets
+    return sum(grades) / len(grades) if grades else fill
+
+
+def _view(np, data, offset, count, typecode):
+    # zero-copy float64 / int64 column over the map
+    if np is not None:
+        return np.frombuffer(data, dtype=np.float64 if typecode == 'd' else np.int64, count=count, offset=offset)
+    return memoryview(data)[offset:offset + count * 8].cast(typecode)
+
+
+class GradebookFile:
+    """
+    A .gbk file mapped in memory.
+    - names: list of [first, last], one per student
+    - terms: list of ColumnarGradebook, one per term, whose columns are views of the map
+    The views stay valid until close(); close() leaves the map to the garbage collector if
+    some of them are still referenced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = None
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._load()
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self):
+        students, terms, names_size, committed = _read_header(self._map, len(self._map))
+        self.names, position = _read_names(self._map, students, names_size)
+
+        np = numpy_or_none()
+        self.terms = []
+        for _ in range(terms):
+            magic, size = TERM_HEADER.unpack_from(self._map, position)
+            if magic != TERM_MAGIC:
+                raise ValueError("Corrupt gradebook file: no term at byte %d" % position)
+            position += TERM_HEADER.size
+            offsets = _view(np, self._map, position, students + 1, 'q')
+            position += (students + 1) * 8
+            scores = _view(np, self._map, position, size, 'd')
+            position += size * 8
+            self.terms.append(ColumnarGradebook(self.names, scores, offsets))
+        if position != committed:
+            raise ValueError("Corrupt gradebook file: terms end at byte %d, header says %d" % (position, committed))
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows(self, term=-1):
+        """
+        :param term: int, index of the term
+        :return: list in the nested shape, [[[first, last], grades], ...], where grades are
+            views of the map; lesson.get_stats and avg take it as it is
+        """
+        gradebook = self.terms[term]
+        return [[name, gradebook.grades_of(i)] for i, name in enumerate(self.names)]
+
+    def grades_of(self, i):
+        """
+        :return: list of float, the grades of student i in all terms
+        """
+        grades = []
+        for gradebook in self.terms:
+            grades.extend(gradebook.grades_of(i).tolist())
+        return grades
+
+    def averages(self, fill=float('nan')):
+        """
+        Average of every student over all terms, with the arithmetic of avg in Script.py:
+        the sum of the student's grades, in term order, over their number. cli stats gives
+        the same averages for a .gbk file and for the same cohort in JSON.
+        :param fill: float, value used for students with no grades
+        :return: float64 buffer with one average per student
+        """
+        means = array('d', (_average(self.grades_of(i), fill) for i in range(len(self))))
+        np = numpy_or_none()
+        return np.frombuffer(means, dtype=np.float64) if np is not None else means
+
+    def get_stats(self, fill=float('nan')):
+        """
+        Same list shape as get_stats in Script.py, over all terms:
+        [[[first, last], [scores...], average], ...]
+        """
+        stats = []
+        for i, name in enumerate(self.names):
+            grades = self.grades_of(i)
+            stats.append([name, grades, _average(grades, fill)])
+        return stats
+
+    def to_nested(self):
+        """
+        :return: list in the nested shape with the grades of all terms, [[[first, last], [scores...]], ...]
+        """
+        return [[name, self.grades_of(i)] for i, name in enumerate(self.names)]
+
+    def close(self):
+        self.terms = []
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # views handed out are still alive; the map closes with the last of them
+        if self._file is not None:
+            self._file.close()
+        self._map = None
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_gradebook(path):
+    """
+    :return: list in the nested shape with the grades of all terms (a copy, see GradebookFile)
+    """
+    with GradebookFile(path) as gradebook:
+        return gradebook.to_nested()
+
+
+# write_gradebook('cohort.gbk', grades)
+# append_term('cohort.gbk', [[['Hassan', 'Munir'], [70.0]]])
+# read_gradebook('cohort.gbk')
+# --> [[['Hassan', 'Munir'], [90.0, 80.0, 90.0, 70.0]], [['Rehana', 'Soltane'], [80.0, 90.0, 90.0]], ...]
@@ -0,0 +1,131 @@
+"""
+The functions of the lesson (Script.py) as an importable library.
+
+Script.py runs the whole lesson when it is imported: it raises AttributeError, NameError and
+ZeroDivisionError on purpose, imports whatever_package and waits on input(). This module only
+defines the functions and imports nothing beyond the standard library, so workers can import
+it cheaply. The batch engines live in vat, gradebook, discount and registration; they import
+NumPy on first use, never at import time.
+
+The loops of add_vat and get_stats have trace points (see tracing), checked once per call.
+The asserts of avg and apply_discount are contracts (see contracts), so they survive python -O
+and can be sampled or switched off; the input checks of age_validated always run.
+"""
+
+from contracts import contracts
+from tracing import tracer
+
+_add_vat_trace = tracer.point('add_vat')
+_get_stats_trace = tracer.point('get_stats')
+
+_avg_contract = contracts.contract('avg', lambda grades: len(grades) != 0, 'There is a list with no grades')
+_discount_contract = contracts.contract('apply_discount', lambda product, price: 0 <= price <= product['price'],
+                                        'Discounted price outside 0 - original price')
+
+
+def add_vat(vat, prices):
+    """
+    Add commission to every price item in the provided iterable.
+    :param vat: float, vat percentage
+    :param prices: iterable, net prices as per customers' receipt
+    :return: list of prices with added vat
+    """
+    if _add_vat_trace.on:
+        return _traced_add_vat(vat, prices)
+    new_prices = [(price / 100 * vat) + price for price in prices]
+    return new_prices
+
+
+def _traced_add_vat(vat, prices):
+    # the price is traced before it is used, so a bad item is the last record on error
+    new_prices = []
+    for price in prices:
+        _add_vat_trace(price)
+        new_prices.append((price / 100 * vat) + price)
+    return new_prices
+
+
+def avg_plain(grades):
+    # raises ZeroDivisionError for a list with no grades
+    return sum(grades) / len(grades)
+
+
+def avg_or_zero(grades):
+    # 'do something better' approach: 0.0 for a list with no grades
+    try:
+        return sum(grades) / len(grades)
+    except ZeroDivisionError:
+        return 0.0
+
+
+def avg(grades):
+    if _avg_contract.on:
+        _avg_contract.countdown -= 1
+        if _avg_contract.countdown <= 0:
+            _avg_contract(grades)
+    return sum(grades) / len(grades)
+
+
+def get_stats(grades, avg=None):
+    """
+    Alongside the name and the grades, add the average of every student.
+    :param grades: list, [[[first, last], [scores...]], ...]
+    :param avg: function used for the average, this module's avg (assert) by default
+    :return: list, [[[first, last], [scores...], average], ...]
+    """
+    if avg is None:
+        # looked up at call time, so a wrapped avg (see telemetry) is picked up
+        avg = globals()['avg']
+    new_grades = []
+    if _get_stats_trace.on:
+        for i in grades:
+            _get_stats_trace(i[0], i[1])
+            new_grades.append([i[0], i[1], avg(i[1])])
+        return new_grades
+    for i in grades:
+        new_grades.append([i[0], i[1], avg(i[1])])
+    return new_grades
+
+
+def apply_discount(product, discount):
+    """
+    Add a discount to the price.
+    :param product: dict obj, item spec including price
+    :param discount: float discount expressed in percent
+    :return: float new price
+    """
+    price = round(product['price'] * (1.0 - (discount / 100)), 2)  # the last 2 is the no. of decimals
+    if _discount_contract.on:  # if the condition is FALSE, raise ContractViolation (an AssertionError)
+        _discount_contract.countdown -= 1
+        if _discount_contract.countdown <= 0:
+            _discount_contract(product, price)
+    return price
+
+
+def age_validated(age):
+    """
+    Checks whether the age is a positive number
+    : param age: int, the age of the user
+    Raise Assertion error if outside of range 12 - 19 (teenager classification)
+    The range is input validation, so it is an explicit raise that python -O keeps.
+    """
+    if age < 0:
+        raise ValueError("Only positive values are allowed")
+    if not 12 <= age <= 19:
+        raise AssertionError("Only ages 12 - 19 are allowed")
+    return True
+
+
+def name_validated(name_string):
+    """
+    Checks whether the name and surname are both given
+    : param name_string: str, the name of the user separated by comma
+    Exceptions: ValueError for missing comma, ValueError for missing name/surname
+    """
+    if ',' not in name_string:
+        raise ValueError("Missing comma")
+
+    name, surname = name_string.split(',')
+
+    if not len(name) or not len(surname):
+        raise ValueError("Incorrect input: Name or surname missing")
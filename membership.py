@@ -0,0 +1,157 @@
+"""
+Gym membership store behind cancel_membership from Script.py.
+
+The lesson's cancel_membership calls gym_members.membership_exists(...) and then
+gym_members.find_membership(...).delete(), two lookups per cancel. MembershipStore keeps a
+hash index from id to slot, so a lookup is O(1) and pop() finds and deletes in one step.
+Deleted slots are left as tombstones and the slots are compacted once enough pile up.
+
+The admin and unknown id checks of cancel_membership are input validation and always run;
+that the store really dropped the membership is a contract (see contracts).
+"""
+
+from contracts import contracts
+
+
+class AuthorizationError(Exception):
+    """
+    Raised when the user is not allowed to perform the attempted action.
+    """
+
+
+class Membership:
+    __slots__ = ('membership_id', 'name', 'details', '_store')
+
+    def __init__(self, membership_id, name, details, store):
+        self.membership_id = membership_id
+        self.name = name
+        self.details = details
+        self._store = store
+
+    def delete(self):
+        self._store.pop(self.membership_id)
+
+    def __repr__(self):
+        return "Membership(%r, %r)" % (self.membership_id, self.name)
+
+
+class MembershipStore:
+    """
+    Memberships in a slot list plus an id -> slot index.
+    - membership_exists / find_membership: one dict lookup
+    - pop: lookup and delete in one step, the slot becomes a tombstone (None)
+    - compaction: once tombstones exceed compact_ratio of the slots, live members are packed
+      and the index is rebuilt, so the cost is spread over many deletes
+    """
+
+    def __init__(self, compact_ratio=0.5, compact_min=1024):
+        """
+        :param compact_ratio: float, fraction of tombstones that triggers a compaction
+        :param compact_min: int, never compact below this many tombstones
+        """
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self._slots = []
+        self._index = {}
+        self._tombstones = 0
+
+    def add(self, membership_id, name, **details):
+        if membership_id in self._index:
+            raise ValueError("Membership %r already exists" % (membership_id,))
+        membership = Membership(membership_id, name, details, self)
+        self._index[membership_id] = len(self._slots)
+        self._slots.append(membership)
+        return membership
+
+    def membership_exists(self, membership_id):
+        return membership_id in self._index
+
+    def find_membership(self, membership_id):
+        """
+        :return: Membership, or None for an unknown id
+        """
+        slot = self._index.get(membership_id)
+        return None if slot is None else self._slots[slot]
+
+    def pop(self, membership_id):
+        """
+        Find and delete a membership in a single lookup.
+        :return: the deleted Membership, or None for an unknown id
+        """
+        slot = self._index.pop(membership_id, None)
+        if slot is None:
+            return None
+        membership = self._slots[slot]
+        self._slots[slot] = None
+        self._tombstones += 1
+        if self._tombstones >= self.compact_min and self._tombstones > self.compact_ratio * len(self._slots):
+            self.compact()
+        return membership
+
+    def compact(self):
+        self._slots = [membership for membership in self._slots if membership is not None]
+        self._index = {membership.membership_id: slot for slot, membership in enumerate(self._slots)}
+        self._tombstones = 0
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, membership_id):
+        return membership_id in self._index
+
+    def __iter__(self):
+        return (membership for membership in self._slots if membership is not None)
+
+
+gym_members = MembershipStore()
+
+
+def _cancelled(members, membership_id, membership):
+    return membership.membership_id == membership_id and membership_id not in members
+
+
+_cancel_contract = contracts.contract('cancel_membership', _cancelled, 'Cancelled membership is still in the store')
+
+
+def cancel_membership(membership_id, user, members=None):
+    """
+    Cancel Gym membership for an existing member (the lesson's "right way", with if/raise
+    instead of assert so the checks survive python -O).
+    :param membership_id: id of the membership to cancel
+    :param user: obj with an is_admin() method
+    :param members: MembershipStore, gym_members by default
+    :return: the cancelled Membership
+    """
+    if not user.is_admin():
+        raise AuthorizationError('Must be admin to cancel')
+    members = gym_members if members is None else members
+    membership = members.pop(membership_id)
+    if membership is None:
+        raise ValueError('Unknown id')
+    if _cancel_contract.on:
+        _cancel_contract.countdown -= 1
+        if _cancel_contract.countdown <= 0:
+            _cancel_contract(members, membership_id, membership)
+    return membership
+
+
+def cancel_memberships(membership_ids, user, members=None):
+    """
+    Cancel many memberships, checking the user's authorization once for the whole batch.
+    :param membership_ids: iterable of membership ids
+    :param user: obj with an is_admin() method
+    :param members: MembershipStore, gym_members by default
+    :return: tuple (cancelled Memberships, unknown ids)
+    """
+    if not user.is_admin():
+        raise AuthorizationError('Must be admin to cancel')
+    members = gym_members if members is None else members
+    cancelled = []
+    unknown = []
+    for membership_id in membership_ids:
+        membership = members.pop(membership_id)
+        if membership is None:
+            unknown.append(membership_id)
+        else:
+            cancelled.append(membership)
+    return cancelled, unknown
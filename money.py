@@ -0,0 +1,182 @@
+"""
+Fixed-point money path for add_vat and apply_discount.
+
+add_vat works on floats (price / 100 * vat + price) and apply_discount rounds a float with
+round(..., 2), so totals drift by fractions of a cent. Here prices are integers in minor
+units (pence/cents) and rates are integers in hundredths of a percent (20% VAT is 2000,
+17.5% is 1750), so every result is exact to the cent with an explicit rounding rule:
+
+- 'half_even': ties go to the even cent (banker's rounding, like round() and Decimal's default)
+- 'half_up': ties go up (towards the larger amount)
+
+The functions take single ints, lists, array('q') or NumPy integer arrays; arrays are
+processed in one vectorised pass.
+"""
+
+from array import array
+from decimal import Decimal, InvalidOperation
+from numbers import Integral
+
+from _numpy import numpy_or_none
+from contracts import contracts
+from discount import DiscountBatch
+
+RATE_SCALE = 10000  # 100% as a rate
+HALF_EVEN = 'half_even'
+HALF_UP = 'half_up'
+ROUNDINGS = (HALF_EVEN, HALF_UP)
+
+_discount_contract = contracts.contract('apply_discount_minor', lambda price, new_price: 0 <= new_price <= price,
+                                        'Discounted price outside 0 - original price')
+
+
+def to_minor(amount, digits=2):
+    """
+    Exact conversion of a money amount to minor units.
+    :param amount: str, Decimal, int or float (floats are taken by their shortest repr)
+    :param digits: int, number of minor digits of the currency
+    :return: int
+    Raises ValueError if the amount has more decimals than the currency.
+    """
+    try:
+        value = Decimal(str(amount)).scaleb(digits)
+    except InvalidOperation:
+        raise ValueError("Not an amount: %r" % (amount,)) from None
+    if value != value.to_integral_value():
+        raise ValueError("%s has more than %d decimals" % (amount, digits))
+    return int(value)
+
+
+def from_minor(units, digits=2):
+    """
+    :return: Decimal amount of the given minor units
+    """
+    return Decimal(int(units)).scaleb(-digits)
+
+
+def rate(percent):
+    """
+    :param percent: str, Decimal, int or float percentage, e.g. 20 or '17.5'
+    :return: int rate in hundredths of a percent
+    """
+    try:
+        return to_minor(percent, 2)
+    except ValueError:
+        raise ValueError("Rates are kept to hundredths of a percent, got %s" % (percent,)) from None
+
+
+def _check_rounding(rounding):
+    if rounding not in ROUNDINGS:
+        raise ValueError("rounding must be one of %s" % ', '.join(ROUNDINGS))
+
+
+def scaled_div(numerator, denominator, rounding=HALF_EVEN):
+    """
+    numerator / denominator rounded to an integer, exactly.
+    :param numerator: int, may be negative
+    :param denominator: int, positive
+    """
+    quotient, remainder = divmod(numerator, denominator)  # floor division, remainder >= 0
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and (rounding == HALF_UP or quotient % 2)):
+        quotient += 1
+    return quotient
+
+
+def _scaled_div_numpy(np, numerator, denominator, rounding):
+    quotient, remainder = np.divmod(numerator, denominator)
+    twice = 2 * remainder
+    up = twice > denominator
+    if rounding == HALF_UP:
+        up |= twice == denominator
+    else:
+        up |= (twice == denominator) & (quotient % 2 == 1)
+    return quotient + up
+
+
+def _int_array(np, values):
+    # int64 view of an integer ndarray or array('q'/'l'), None for other containers
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'iu':
+        return values.astype(np.int64, copy=False)
+    if isinstance(values, array) and values.typecode in 'qlih':
+        return np.asarray(values, dtype=np.int64)
+    return None
+
+
+def add_vat_minor(vat_rate, prices, rounding=HALF_EVEN):
+    """
+    Add vat to prices held in minor units.
+    :param vat_rate: int, vat in hundredths of a percent (see rate())
+    :param prices: int, or list / array('q') / NumPy int array of prices in minor units
+    :param rounding: 'half_even' or 'half_up', applied to the vat-inclusive price of every item
+    :return: int, list of ints or int64 ndarray, matching the input
+    """
+    _check_rounding(rounding)
+    factor = RATE_SCALE + vat_rate
+    if isinstance(prices, Integral):
+        return scaled_div(prices * factor, RATE_SCALE, rounding)
+
+    np = numpy_or_none()
+    column = _int_array(np, prices) if np is not None else None
+    if column is not None:
+        return _scaled_div_numpy(np, column * factor, RATE_SCALE, rounding)
+    return [scaled_div(price * factor, RATE_SCALE, rounding) for price in prices]
+
+
+def apply_discount_minor(price, discount_rate, rounding=HALF_EVEN):
+    """
+    apply_discount for a price in minor units.
+    :param price: int, price in minor units
+    :param discount_rate: int, discount in hundredths of a percent (see rate())
+    :return: int new price
+    """
+    _check_rounding(rounding)
+    new_price = scaled_div(price * (RATE_SCALE - discount_rate), RATE_SCALE, rounding)
+    if _discount_contract.on:  # like lesson.apply_discount, a contract rather than an assert
+        _discount_contract.countdown -= 1
+        if _discount_contract.countdown <= 0:
+            _discount_contract(price, new_price)
+    return new_price
+
+
+def apply_discount_minor_bulk(prices, discount_rate, skus=None, rounding=HALF_EVEN):
+    """
+    apply_discount_bulk for prices in minor units.
+    :param prices: list / array('q') / NumPy int array of prices in minor units
+    :param discount_rate: int rate, or one rate per item, in hundredths of a percent
+    :param skus: optional sequence of SKUs aligned with prices, used to report offenders
+    :param rounding: 'half_even' or 'half_up'
+    :return: DiscountBatch(prices, valid, offending)
+    Items whose new price falls outside 0 <= new price <= old price keep their old price,
+    are flagged in valid and reported in offending.
+    """
+    _check_rounding(rounding)
+    if not isinstance(discount_rate, Integral) and len(discount_rate) != len(prices):
+        raise ValueError("Got %d discount rates for %d prices" % (len(discount_rate), len(prices)))
+    if skus is not None and len(skus) != len(prices):
+        raise ValueError("Got %d SKUs for %d prices" % (len(skus), len(prices)))
+    np = numpy_or_none()
+    column = _int_array(np, prices) if np is not None else None
+    if column is not None:
+        rates = np.asarray(discount_rate, dtype=np.int64)
+        new_prices = _scaled_div_numpy(np, column * (RATE_SCALE - rates), RATE_SCALE, rounding)
+        valid = (new_prices >= 0) & (new_prices <= column)
+        new_prices = np.where(valid, new_prices, column)
+        rejected = np.flatnonzero(~valid).tolist()
+    else:
+        rates = discount_rate if not isinstance(discount_rate, Integral) else [discount_rate] * len(prices)
+        new_prices, valid, rejected = [], bytearray(len(prices)), []
+        for i, (price, item_rate) in enumerate(zip(prices, rates)):
+            new_price = scaled_div(price * (RATE_SCALE - item_rate), RATE_SCALE, rounding)
+            if 0 <= new_price <= price:
+                new_prices.append(new_price)
+                valid[i] = 1
+            else:
+                new_prices.append(price)
+                rejected.append(i)
+    offending = rejected if skus is None else [skus[i] for i in rejected]
+    return DiscountBatch(new_prices, valid, offending)
+
+
+# add_vat_minor(rate(20), [2400, 15, 3245])          # --> [2880, 18, 3894]
+# apply_discount_minor(to_minor('79.99'), rate(25))  # --> 5999 (59.9925 rounded)
@@ -0,0 +1,125 @@
+"""
+Compact record types for the gradebook rows and the products of the lesson.
+
+A gradebook row is [['Hassan', 'Munir'], [90.0, 80.0, 90.0]]: two lists plus a float object
+per grade. Student keeps the name in a tuple and the grades in an array('d') (8 bytes per
+grade) and has no __dict__. It still behaves like the row (len 2, row[0] is the name,
+row[1] the grades, and it unpacks as name, grades), so get_stats, avg, ColumnarGradebook
+and IncrementalGradebook take it as it is.
+
+A product is {'name': ..., 'price': ...}. Product has two slots and answers
+product['price'], so apply_discount and catalog_columns take it as it is.
+"""
+
+from array import array
+
+
+class Student:
+    __slots__ = ('name', 'grades')
+
+    def __init__(self, name, grades=()):
+        """
+        :param name: [first, last] or (first, last)
+        :param grades: iterable of float grades
+        """
+        self.name = tuple(name)
+        self.grades = grades if isinstance(grades, array) and grades.typecode == 'd' else array('d', grades)
+
+    @classmethod
+    def from_row(cls, row):
+        # from the Script.py shape, [[first, last], [scores...]]
+        return cls(row[0], row[1])
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, i):
+        return (self.name, self.grades)[i]
+
+    def __iter__(self):
+        yield self.name
+        yield self.grades
+
+    def __eq__(self, other):
+        if not isinstance(other, Student):
+            return NotImplemented
+        return self.name == other.name and self.grades == other.grades
+
+    def __repr__(self):
+        return "Student(%r, %r)" % (list(self.name), self.grades.tolist())
+
+
+class StudentStats:
+    # get_stats row, [name, grades, average], in three slots
+    __slots__ = ('name', 'grades', 'average')
+
+    def __init__(self, name, grades, average):
+        self.name = name
+        self.grades = grades
+        self.average = average
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, i):
+        return (self.name, self.grades, self.average)[i]
+
+    def __iter__(self):
+        yield self.name
+        yield self.grades
+        yield self.average
+
+    def __repr__(self):
+        return "StudentStats(%r, %r, %r)" % (list(self.name), self.grades.tolist(), self.average)
+
+
+class Product:
+    __slots__ = ('name', 'price')
+
+    def __init__(self, name, price):
+        self.name = name
+        self.price = float(price)
+
+    @classmethod
+    def from_dict(cls, product):
+        return cls(product['name'], product['price'])
+
+    def __getitem__(self, key):
+        # product['price'] / product['name'], like the dict it replaces
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other):
+        if not isinstance(other, Product):
+            return NotImplemented
+        return self.name == other.name and self.price == other.price
+
+    def __repr__(self):
+        return "Product(%r, %r)" % (self.name, self.price)
+
+
+def students(grades):
+    """
+    :param grades: list in the Script.py shape, [[[first, last], [scores...]], ...]
+    :return: list of Student
+    """
+    return [Student(name, student_grades) for name, student_grades in grades]
+
+
+def get_student_stats(students, avg=None):
+    """
+    get_stats for Student records.
+    :param students: iterable of Student
+    :param avg: function used for the average, lesson.avg (assert) by default
+    :return: list of StudentStats
+    """
+    if avg is None:
+        import lesson
+        avg = lesson.avg
+    return [StudentStats(student.name, student.grades, avg(student.grades)) for student in students]
+
+
+# get_stats([Student(['Hassan', 'Munir'], [90.0, 80.0, 90.0])])
+# --> [[('Hassan', 'Munir'), array('d', [90.0, 80.0, 90.0]), 86.66666666666667]]
+# apply_discount(Product('Running Trainers', 79.99), 25)  # --> 59.99
@@ -0,0 +1,268 @@
+"""
+Registration helpers for the teenager club practice in Script.py.
+
+The practice opens registration_file.txt, writes one record (without a newline) and closes
+the file again for every member. RegistrationLog keeps the file open, buffers records and
+writes them out in group commits.
+
+name_validated and age_validated are the practice's rules; validate_batch applies the same
+rules to many records without raising an exception per invalid row.
+"""
+
+import atexit
+import os
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from lesson import age_validated, name_validated  # the rules validate_batch mirrors
+from tracing import tracer
+
+FSYNC_POLICIES = ('never', 'commit', 'close')
+
+# reason codes of validate_batch, with the message of the exception the rules raise
+VALID = 0
+MISSING_COMMA = 1
+TOO_MANY_COMMAS = 2
+NAME_MISSING = 3
+AGE_NOT_INTEGER = 4
+AGE_NEGATIVE = 5
+AGE_OUT_OF_RANGE = 6
+
+REASONS = {
+    MISSING_COMMA: "Missing comma",
+    TOO_MANY_COMMAS: "too many values to unpack (expected 2)",
+    NAME_MISSING: "Incorrect input: Name or surname missing",
+    AGE_NOT_INTEGER: "invalid literal for int() with base 10",
+    AGE_NEGATIVE: "Only positive values are allowed",
+    AGE_OUT_OF_RANGE: "The age is not within the 'teenager' category",
+}
+
+
+def name_reason(name_string):
+    # reason code name_validated would raise for, without raising
+    commas = name_string.count(',')
+    if not commas:
+        return MISSING_COMMA
+    if commas > 1:
+        return TOO_MANY_COMMAS
+    name, _, surname = name_string.partition(',')
+    if not name or not surname:
+        return NAME_MISSING
+    return VALID
+
+
+def parse_age(age):
+    """
+    int(age) for typed-in ages, without raising.
+    :return: int, or None where int() would raise ValueError
+    """
+    if not isinstance(age, str):
+        return age
+    digits = age.strip()
+    if digits[:1] in ('+', '-'):
+        digits = digits[1:]
+    if digits.isdecimal():
+        return int(age)
+    if '_' in digits:  # int() also accepts digit groups such as '1_5', rare enough to just try
+        try:
+            return int(age)
+        except ValueError:
+            pass
+    return None
+
+
+def age_reason(age):
+    # reason code age_validated would fail with, without raising
+    if age < 0:
+        return AGE_NEGATIVE
+    if not 12 <= age <= 19:
+        return AGE_OUT_OF_RANGE
+    return VALID
+
+
+_validate_trace = tracer.point('validate_batch')
+
+# valid: indices of the valid records
+# invalid: indices of the invalid records
+# reasons: one reason code per invalid record, aligned with invalid
+BatchValidation = namedtuple('BatchValidation', ['valid', 'invalid', 'reasons'])
+
+
+def validate_batch(records):
+    """
+    Run name_validated and age_validated over many records without an exception per row.
+    :param records: iterable of (name_string, age); age may be an int or the typed-in text
+    :return: BatchValidation(valid, invalid, reasons) as compact arrays
+    Rules run in the practice's order (name first, then age), so every invalid record gets
+    the reason of the first rule it breaks. REASONS maps the codes to the error messages.
+    """
+    valid = array('q')
+    invalid = array('q')
+    reasons = array('B')
+    trace = _validate_trace if _validate_trace.on else None
+    for i, (name_string, age) in enumerate(records):
+        reason = name_reason(name_string)
+        if reason == VALID:
+            age = parse_age(age)
+            reason = AGE_NOT_INTEGER if age is None else age_reason(age)
+        if trace is not None:
+            trace(name_string, age, reason)
+        if reason == VALID:
+            valid.append(i)
+        else:
+            invalid.append(i)
+            reasons.append(reason)
+    return BatchValidation(valid, invalid, reasons)
+
+
+def register(name_string, age, log):
+    """
+    The practice's registration flow for one person, without input(): validate the name,
+    turn the age into an int, validate it and write the record.
+    :param name_string: str, the name of the user separated by comma
+    :param age: int, or the typed-in text
+    :param log: RegistrationLog the record is written to
+    :return: True
+    Raises ValueError or AssertionError for invalid input, like the practice.
+    """
+    name_validated(name_string)
+    age = int(age)
+    age_validated(age)
+    log.write(name_string, age)
+    return True
+
+
+def format_record(name, age):
+    # same text as the practice, one record per line
+    return "New member name: {} and age {}\n".format(name, age)
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b'\n'
+
+
+class RegistrationLog:
+    """
+    Append-only, newline-delimited registration file with group commits.
+    Pending records are written when max_records or max_bytes is reached, when the oldest
+    pending record is older than flush_interval seconds, on flush() and on close().
+    close() also runs at interpreter exit, so pending records are not lost on a normal exit.
+    """
+
+    def __init__(self, path="registration_file.txt", max_records=256, max_bytes=64 * 1024,
+                 flush_interval=1.0, fsync='commit'):
+        """
+        :param path: str, registration file, created if it does not exist
+        :param max_records: int, commit once this many records are pending
+        :param max_bytes: int, commit once this many bytes are pending
+        :param flush_interval: float, seconds a record may wait before it is committed;
+            None disables the background flusher
+        :param fsync: str, 'never', 'commit' (after every group commit) or 'close'
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError("fsync must be one of %s" % ', '.join(FSYNC_POLICIES))
+        self.path = path
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.commits = 0
+
+        self._file = open(path, 'a', encoding='utf-8')
+        # a file written by the practice has no newline after its last record; the first
+        # commit starts with one so the new records do not run into it
+        self._separator = '\n' if self._file.tell() and not _ends_with_newline(path) else ''
+        self._pending = []
+        self._pending_bytes = 0
+        self._oldest = None
+        self._lock = threading.Condition()
+        self._closed = False
+
+        self._flusher = None
+        if flush_interval is not None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='registration-log', daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def write(self, name, age):
+        self.write_record(format_record(name, age))
+
+    def write_record(self, record):
+        """
+        :param record: str, one record; a trailing newline is added if missing
+        """
+        if not record.endswith('\n'):
+            record += '\n'
+        with self._lock:
+            if self._closed:
+                raise ValueError("Registration log is closed")
+            if not self._pending:
+                self._oldest = time.monotonic()
+                self._lock.notify()
+            self._pending.append(record)
+            self._pending_bytes += len(record)
+            if len(self._pending) >= self.max_records or self._pending_bytes >= self.max_bytes:
+                self._commit()
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def _commit(self):
+        # caller holds the lock
+        if not self._pending:
+            return
+        self._file.write(self._separator + ''.join(self._pending))
+        self._separator = ''
+        self._file.flush()
+        if self.fsync == 'commit':
+            os.fsync(self._file.fileno())
+        self._pending = []
+        self._pending_bytes = 0
+        self._oldest = None
+        self.commits += 1
+
+    def _flush_loop(self):
+        with self._lock:
+            while not self._closed:
+                if self._oldest is None:
+                    self._lock.wait()
+                    continue
+                remaining = self._oldest + self.flush_interval - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                else:
+                    self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._commit()
+                if self.fsync != 'never':
+                    os.fsync(self._file.fileno())
+            finally:
+                self._closed = True
+                self._file.close()
+                self._lock.notify()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# validate_batch([('Hassan,Munir', 15), ('Rehana Soltane', 14), ('Andreea,Avramescu', '21')])
+# --> valid [0], invalid [1, 2], reasons [MISSING_COMMA, AGE_OUT_OF_RANGE]
+
+# with RegistrationLog("registration_file.txt") as registrations:
+#     registrations.write("Hassan,Munir", 15)
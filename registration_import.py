@@ -0,0 +1,193 @@
+"""
+Bulk import of sign-ups into the registration file.
+
+The practice registers one person at a time: input(), name_validated, age_validated, then
+a file append. import_registrations runs the same steps over a whole CSV as a pipeline of
+three stages connected by bounded queues, so a slow stage holds the others back instead of
+filling memory:
+
+    parse (reader thread) -> validate (thread or process pool) -> dedupe + write (caller)
+
+Members already in the registration file, or seen earlier in the same import, are skipped.
+If the writing stage fails, the other two are stopped and the pending chunks are cancelled
+before the error is raised.
+"""
+
+import csv
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from registration import REASONS, RegistrationLog, parse_age, validate_batch
+from registration_reader import RegistrationReader
+
+ImportReport = namedtuple('ImportReport', ['imported', 'rejected', 'skipped', 'seconds', 'rows_per_sec'])
+
+_DONE = object()
+_POLL = 0.1  # seconds a stage blocks on a queue before it checks the stop event
+
+
+def _put(items, item, stop):
+    # put that gives up once stop is set; returns False when it gave up
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=_POLL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _parse(source, header, chunk_size, chunks, stop, failures):
+    # stage 1: CSV rows -> [(line number, name, age), ...] chunks
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            file = open(source, newline='', encoding='utf-8')
+        else:
+            file = source
+        try:
+            chunk = []
+            for line_no, row in enumerate(csv.reader(file), 1):
+                if (header and line_no == 1) or not row:
+                    continue
+                chunk.append((line_no, row[0], row[1] if len(row) > 1 else ''))
+                if len(chunk) == chunk_size:
+                    if not _put(chunks, chunk, stop):
+                        return
+                    chunk = []
+            if chunk:
+                _put(chunks, chunk, stop)
+        finally:
+            if file is not source:
+                file.close()
+    except BaseException as exc:
+        failures.append(exc)
+    finally:
+        _put(chunks, _DONE, stop)
+
+
+def _validate_chunk(chunk):
+    # stage 2, runs in the pool
+    return chunk, validate_batch([(name, age) for _, name, age in chunk])
+
+
+def _dispatch(chunks, validated, pool, stop, failures):
+    # feeds the pool from the parse queue; futures are queued in order for the writer
+    try:
+        while not stop.is_set():
+            try:
+                chunk = chunks.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+            if chunk is _DONE:
+                break
+            future = pool.submit(_validate_chunk, chunk)
+            if not _put(validated, future, stop):
+                future.cancel()
+                return
+    except BaseException as exc:
+        failures.append(exc)
+    finally:
+        _put(validated, _DONE, stop)
+
+
+def _cancel_pending(validated):
+    while True:
+        try:
+            future = validated.get_nowait()
+        except queue.Empty:
+            return
+        if future is not _DONE:
+            future.cancel()
+
+
+def _reject_sink(rejects):
+    if rejects is None:
+        return lambda line_no, name, age, reason: None
+    if callable(rejects):
+        return rejects
+    return lambda line_no, name, age, reason: rejects.write("%d,%s,%s,%s\n" % (line_no, name, age, reason))
+
+
+def import_registrations(source, path="registration_file.txt", workers=4, processes=False,
+                         chunk_size=1000, queue_size=8, header=False, rejects=None, log=None):
+    """
+    Validate and register every sign-up of a CSV file.
+    :param source: path or open text file, rows of '"name,surname",age'
+    :param path: registration file; members already in it (see RegistrationReader) are skipped
+    :param workers: int, validation workers
+    :param processes: bool, validate in a process pool instead of a thread pool
+    :param chunk_size: int, rows handed to a worker at once
+    :param queue_size: int, chunks allowed to wait between two stages
+    :param header: bool, skip the first line
+    :param rejects: optional callback(line_no, name, age, reason) or writable file for invalid rows
+    :param log: optional RegistrationLog to write through; one is opened on path otherwise
+    :return: ImportReport(imported, rejected, skipped, seconds, rows_per_sec)
+    """
+    start = time.perf_counter()
+    reject = _reject_sink(rejects)
+    reader = RegistrationReader(path)
+    seen = set()  # members imported by this run, the reader only knows the file as it was
+
+    chunks = queue.Queue(maxsize=queue_size)
+    validated = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    failures = []
+    own_log = log is None
+    if own_log:
+        log = RegistrationLog(path, flush_interval=None)
+    pool = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(max_workers=workers)
+
+    imported = rejected = skipped = 0
+    parser = threading.Thread(target=_parse, args=(source, header, chunk_size, chunks, stop, failures), daemon=True)
+    dispatcher = threading.Thread(target=_dispatch, args=(chunks, validated, pool, stop, failures), daemon=True)
+    parser.start()
+    dispatcher.start()
+    try:
+        # stage 3: dedupe and write, in input order
+        while True:
+            future = validated.get()
+            if future is _DONE:
+                break
+            chunk, result = future.result()
+            for i, reason in zip(result.invalid, result.reasons):
+                line_no, name, age = chunk[i]
+                reject(line_no, name, age, REASONS[reason])
+            rejected += len(result.invalid)
+            for i in result.valid:
+                _, name, age = chunk[i]
+                if name in seen or name in reader:
+                    skipped += 1
+                    continue
+                seen.add(name)
+                log.write(name, parse_age(age))
+                imported += 1
+    except BaseException:
+        # the producers may be blocked on full queues nobody reads any more
+        stop.set()
+        _cancel_pending(validated)
+        raise
+    finally:
+        parser.join()
+        dispatcher.join()
+        _cancel_pending(validated)
+        pool.shutdown(cancel_futures=True)
+        reader.close()
+        if own_log:
+            log.close()
+        else:
+            log.flush()
+    if failures:
+        raise failures[0]
+
+    seconds = time.perf_counter() - start
+    rows = imported + rejected + skipped
+    return ImportReport(imported, rejected, skipped, seconds, rows / seconds if seconds else float('inf'))
+
+
+# report = import_registrations('sign_ups.csv', workers=4, header=True)
+# print("%d imported, %d rejected, %d skipped (%.0f rows/s)" % (
+#     report.imported, report.rejected, report.skipped, report.rows_per_sec))
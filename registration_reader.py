@@ -0,0 +1,231 @@
+"""
+Reader and member index for registration_file.txt.
+
+The practice's independent exercise is reading a file that may not exist. RegistrationReader
+memory-maps the registration file (a missing or empty file is just an empty register),
+walks the records in place and keeps a persistent index next to it, name -> byte offset,
+so looking a member up or checking for a duplicate does not scan the file. The index file
+records how many bytes of the registration file it covers; refresh() only parses what was
+appended since. It also records which file it covers, its inode and a hash of its first
+record: a registration file that was truncated or replaced, even by one of the same size or
+larger, is indexed again from scratch.
+
+Records are "New member name: <name> and age <age>", one per line. Files written by the
+practice before RegistrationLog have no newline between records, those are split on the
+"New member name: " marker; their last record ends at the end of the file once its age is
+complete (digits only).
+"""
+
+import hashlib
+import mmap
+import os
+
+MARKER = b"New member name: "
+AGE_SEPARATOR = b" and age "
+INDEX_MAGIC = b"REGIDX2 "
+NO_RECORD = b"0" * 16
+# magic, zero-padded covered size, inode and first record hash separated by spaces, newline
+HEADER_SIZE = len(INDEX_MAGIC) + 20 + 1 + 20 + 1 + len(NO_RECORD) + 1
+
+
+def _record_end(data, start, size):
+    # end of the record starting at start: its newline, the next marker, the end of the data
+    # for a last record without newline (as the practice writes them), or None if unfinished
+    newline = data.find(b"\n", start, size)
+    following = data.find(MARKER, start + len(MARKER), size)
+    if following != -1 and (newline == -1 or following < newline):
+        return following, following
+    if newline != -1:
+        return newline, newline + 1
+    separator = data.rfind(AGE_SEPARATOR, start, size)
+    if separator != -1 and data[separator + len(AGE_SEPARATOR):size].isdigit():
+        return size, size
+    return None, None
+
+
+def _first_record_hash(data, size):
+    # hash of the first finished record, without its terminator: appends never change it
+    pos = data.find(MARKER, 0, size)
+    if pos == -1:
+        return NO_RECORD
+    end, _ = _record_end(data, pos, size)
+    if end is None:
+        return NO_RECORD
+    return hashlib.blake2b(data[pos:end], digest_size=8).hexdigest().encode('ascii')
+
+
+def _index_header(covered, identity):
+    inode, first_record = identity
+    return b"%s%020d %020d %s\n" % (INDEX_MAGIC, covered, inode, first_record)
+
+
+def parse_records(data, start=0, size=None):
+    """
+    Walk the records of a registration file held in a buffer (bytes or mmap).
+    :param data: buffer with the file content
+    :param start: int, byte offset to start from
+    :param size: int, number of bytes of data to look at (all by default)
+    :return: generator of (offset, name, age, next offset); only finished records
+    """
+    size = len(data) if size is None else size
+    pos = data.find(MARKER, start, size)
+    while pos != -1:
+        end, following = _record_end(data, pos, size)
+        if end is None:
+            return
+        separator = data.rfind(AGE_SEPARATOR, pos, end)
+        if separator != -1:
+            name = data[pos + len(MARKER):separator].decode('utf-8')
+            age = data[separator + len(AGE_SEPARATOR):end].strip()
+            yield pos, name, int(age) if age.isdigit() else age.decode('utf-8'), following
+        pos = data.find(MARKER, following, size)
+
+
+class RegistrationReader:
+    """
+    Members of a registration file, indexed by name.
+    - name in reader, reader.lookup(name): one dict lookup plus one record read from the map
+    - refresh(): index the records appended since the last call (also done on open)
+    """
+
+    def __init__(self, path="registration_file.txt", index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self._file = None
+        self._map = None
+        self._offsets = {}
+        self._covered = 0
+        self._inode = 0
+        self._identity = (0, NO_RECORD)  # of the file the index covers
+        self._load_index()
+        self.refresh()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'rb') as index:
+                header = index.read(HEADER_SIZE)
+                if not header.startswith(INDEX_MAGIC) or len(header) != HEADER_SIZE:
+                    return  # refresh() rewrites it
+                covered, inode, first_record = header[len(INDEX_MAGIC):-1].split(b" ")
+                for line in index:
+                    offset, _, name = line.rstrip(b"\n").partition(b"\t")
+                    self._offsets.setdefault(name.decode('utf-8'), int(offset))
+        except FileNotFoundError:
+            return
+        self._covered = int(covered)
+        self._identity = (int(inode), first_record)
+
+    def _remap(self):
+        # map the whole file as it is now; returns its size, 0 for a missing or empty file
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._close_map()
+            return 0
+        if self._map is not None and len(self._map) == stat.st_size and self._inode == stat.st_ino:
+            return stat.st_size
+        self._close_map()
+        if not stat.st_size:
+            return 0
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        return len(self._map)
+
+    def refresh(self):
+        """
+        Index the records appended to the registration file since the last refresh, or
+        all of them if the file was truncated or replaced.
+        :return: int, number of records added to the index
+        """
+        size = self._remap()
+        identity = (self._inode, _first_record_hash(self._map, size)) if size else (0, NO_RECORD)
+        rebuild = size < self._covered or identity != self._identity
+        if rebuild:
+            self._offsets = {}
+            self._covered = 0
+
+        entries = []
+        covered = self._covered
+        if size > covered:
+            for offset, name, _, following in parse_records(self._map, covered, size):
+                if name not in self._offsets:
+                    self._offsets[name] = offset
+                    entries.append(b"%d\t%s\n" % (offset, name.encode('utf-8')))
+                covered = following
+        if covered == self._covered and not rebuild:
+            return 0
+        self._write_index(entries, covered, identity, rebuild)
+        self._covered = covered
+        self._identity = identity
+        return len(entries)
+
+    def _write_index(self, entries, covered, identity, rebuild):
+        # entries first, then the covered size; a crash in between only means the same
+        # records are parsed again, and setdefault keeps the first offset of every name.
+        # A rebuild starts the file over, the entries of the old registration file go with it
+        mode = 'r+b' if not rebuild and os.path.exists(self.index_path) else 'w+b'
+        with open(self.index_path, mode) as index:
+            if mode == 'w+b' or index.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                index.seek(0)
+                index.truncate()
+                index.write(_index_header(0, identity))
+                for name, offset in self._offsets.items():
+                    index.write(b"%d\t%s\n" % (offset, name.encode('utf-8')))
+                entries = []
+            index.seek(0, os.SEEK_END)
+            index.writelines(entries)
+            index.flush()
+            index.seek(0)
+            index.write(_index_header(covered, identity))
+
+    def __contains__(self, name):
+        return name in self._offsets
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def offset(self, name):
+        return self._offsets.get(name)
+
+    def lookup(self, name):
+        """
+        :return: tuple (name, age) of the member's first registration, or None
+        """
+        offset = self._offsets.get(name)
+        if offset is None:
+            return None
+        for _, found, age, _ in parse_records(self._map, offset):
+            return found, age
+        return None
+
+    def records(self):
+        """
+        :return: generator of (name, age) for every finished record in the file
+        """
+        size = self._remap()
+        if not size:
+            return
+        for _, name, age, _ in parse_records(self._map, 0, size):
+            yield name, age
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = None
+        self._file = None
+
+    def close(self):
+        self._close_map()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# with RegistrationReader("registration_file.txt") as members:
+#     "Hassan,Munir" in members        # --> True
+#     members.lookup("Hassan,Munir")   # --> ('Hassan,Munir', 15)
@@ -0,0 +1,241 @@
+"""
+Registration practice from Script.py as an asyncio service.
+
+Instead of one person at a time through input(), clients connect over TCP (or a Unix socket)
+and send one registration per line:
+
+    <name>,<surname>\t<age>\n
+
+and get one reply per line, "OK" or "ERROR <message>". Records are validated with the
+practice's rules and written through AsyncRegistrationLog, which groups concurrent
+registrations into one commit without blocking the event loop.
+
+    python registration_server.py serve --port 8765
+    python registration_server.py load --port 8765 --clients 100 --requests 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from registration import (
+    AGE_NOT_INTEGER, REASONS, VALID, RegistrationLog, age_reason, format_record, name_reason, parse_age,
+)
+
+
+_CLOSE = object()  # queued by close(), after the last record
+
+
+class AsyncRegistrationLog:
+    """
+    Non-blocking front of RegistrationLog. write() waits until the record is committed, and
+    every record that arrives while a commit is running goes into the next group commit.
+    close() lets the writer commit every record queued before it.
+    """
+
+    def __init__(self, path="registration_file.txt", fsync='commit', max_batch=1024):
+        self._log = RegistrationLog(path, max_records=max_batch + 1, max_bytes=float('inf'),
+                                    flush_interval=None, fsync=fsync)
+        self._queue = asyncio.Queue()
+        self._max_batch = max_batch
+        self._writer = None
+        self._closing = False
+
+    def start(self):
+        self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    async def write(self, name, age):
+        if self._closing:
+            raise ValueError("Registration log is closed")
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put((format_record(name, age), done))
+        await done
+
+    def _commit(self, records):
+        # runs in a worker thread so the file I/O does not block the event loop
+        for record in records:
+            self._log.write_record(record)
+        self._log.flush()
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            closing = batch[-1] is _CLOSE  # nothing is queued after it
+            if closing:
+                batch.pop()
+                if not batch:
+                    return
+            try:
+                await loop.run_in_executor(None, self._commit, [record for record, _ in batch])
+            except Exception as exc:
+                for _, done in batch:
+                    if not done.done():
+                        done.set_exception(exc)
+            else:
+                for _, done in batch:
+                    if not done.done():
+                        done.set_result(None)
+            if closing:
+                return
+
+    async def close(self):
+        self._closing = True
+        if self._writer is not None and not self._writer.done():
+            # the writer drains the queue up to the sentinel, then returns
+            await self._queue.put(_CLOSE)
+            await self._writer
+        self._log.close()
+
+
+def check_registration(line):
+    """
+    :param line: str, "<name>,<surname>\\t<age>"
+    :return: tuple (name, age, error message or None)
+    """
+    name, _, age = line.partition('\t')
+    reason = name_reason(name)
+    if reason == VALID:
+        age = parse_age(age)
+        reason = AGE_NOT_INTEGER if age is None else age_reason(age)
+    if reason == VALID:
+        return name, age, None
+    return name, age, REASONS[reason]
+
+
+async def _read_line(reader):
+    # readline() that skips a line over the reader's limit (up to its newline) and returns None
+    # for it, where readline() raises ValueError and leaves the rest of the line behind
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as exc:
+        return exc.partial  # last line without newline, b'' at the end of the stream
+    except asyncio.LimitOverrunError as exc:
+        consumed = exc.consumed
+    while True:
+        try:
+            await reader.readexactly(consumed)  # the part scanned so far has no newline
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return b''
+        except asyncio.LimitOverrunError as exc:
+            consumed = exc.consumed
+
+
+async def handle_client(reader, writer, log):
+    try:
+        while True:
+            line = await _read_line(reader)
+            if line is None:
+                writer.write(b"ERROR line too long\n")
+                await writer.drain()
+                continue
+            if not line:
+                break
+            try:
+                text = line.decode('utf-8')
+            except UnicodeDecodeError:
+                writer.write(b"ERROR invalid encoding\n")
+                await writer.drain()
+                continue
+            name, age, error = check_registration(text.rstrip('\r\n'))
+            if error is None:
+                await log.write(name, age)
+                writer.write(b"OK\n")
+            else:
+                writer.write(("ERROR %s\n" % error).encode('utf-8'))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host='127.0.0.1', port=8765, unix=None, path="registration_file.txt", fsync='commit'):
+    log = AsyncRegistrationLog(path, fsync=fsync)
+    log.start()
+
+    async def client(reader, writer):
+        await handle_client(reader, writer, log)
+
+    if unix:
+        server = await asyncio.start_unix_server(client, path=unix)
+    else:
+        server = await asyncio.start_server(client, host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await log.close()
+
+
+async def _load_client(connect, requests, latencies):
+    reader, writer = await connect()
+    try:
+        for i in range(requests):
+            # every 10th registration is out of the teenager range, to exercise the error path
+            age = 25 if i % 10 == 9 else 12 + i % 8
+            start = time.perf_counter()
+            writer.write(("Load,Client%d\t%d\n" % (i, age)).encode('utf-8'))
+            await writer.drain()
+            await reader.readline()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def load(host='127.0.0.1', port=8765, unix=None, clients=50, requests=100):
+    """
+    Load generator: `clients` concurrent connections sending `requests` registrations each.
+    :return: dict with requests, seconds, requests_per_sec, p50_ms and p99_ms
+    """
+    if unix:
+        connect = lambda: asyncio.open_unix_connection(unix)
+    else:
+        connect = lambda: asyncio.open_connection(host, port)
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_load_client(connect, requests, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'requests_per_sec': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teenager club registration service")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command in ('serve', 'load'):
+        sub = commands.add_parser(command)
+        sub.add_argument('--host', default='127.0.0.1')
+        sub.add_argument('--port', type=int, default=8765)
+        sub.add_argument('--unix', help="Unix socket path, used instead of TCP")
+    commands.choices['serve'].add_argument('--file', default="registration_file.txt")
+    commands.choices['serve'].add_argument('--fsync', default='commit', choices=('never', 'commit', 'close'))
+    commands.choices['load'].add_argument('--clients', type=int, default=50)
+    commands.choices['load'].add_argument('--requests', type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.host, args.port, args.unix, args.file, args.fsync))
+        except KeyboardInterrupt:
+            pass
+    else:
+        report = asyncio.run(load(args.host, args.port, args.unix, args.clients, args.requests))
+        print("%(requests)d requests in %(seconds).2fs: %(requests_per_sec).0f req/s, "
+              "p50 %(p50_ms).2f ms, p99 %(p99_ms).2f ms" % report)
+
+
+if __name__ == '__main__':
+    main()
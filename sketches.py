@@ -0,0 +1,291 @@
+"""
+Streaming statistics to go beside avg.
+
+avg gives only the mean, and get_stats needs every student's full list of grades in memory.
+Moments keeps exact count, mean, variance (Welford's method), min and max in O(1) memory;
+KLLSketch keeps approximate quantiles (median, percentiles) in O(k log n) memory with a
+configurable rank error. Both merge, so partial results from different shards or files
+combine into cohort-level results. GradeStats tracks both per student and for the cohort.
+
+    stats = GradeStats(error=0.01)
+    for name, grade in grade_stream:
+        stats.add(name, grade)
+    stats.merge(stats_from_another_file)
+    stats.cohort.summary()  # count, mean, stddev, min, max, median, p90, p99
+"""
+
+import math
+import random
+
+_rng = random.Random()  # shared by the sketches that were not given their own seed
+
+
+class Moments:
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        # Chan et al. pairwise combination of two sets of moments
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self, sample=False):
+        """
+        :param sample: bool, sample variance (n - 1) instead of population variance (n)
+        :return: float, NaN when there are not enough values
+        """
+        count = self.count - 1 if sample else self.count
+        return self.m2 / count if count > 0 else math.nan
+
+    def stddev(self, sample=False):
+        return math.sqrt(self.variance(sample))
+
+
+class _Compactor(list):
+
+    def compact(self, rng):
+        # keep every other item of the sorted buffer, starting at a random end; each kept
+        # item then stands for two. With an odd length one item stays behind.
+        self.sort()
+        kept = []
+        first = rng.random() < 0.5
+        while len(self) >= 2:
+            a = self.pop()
+            b = self.pop()
+            kept.append(a if first else b)
+        return kept
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016). Level h holds items of weight 2**h;
+    a level that fills up is compacted into the level above, with capacities shrinking by c
+    going down, so memory stays around k / (1 - c) items whatever the stream length.
+    """
+
+    def __init__(self, k=None, error=0.01, c=2 / 3, seed=None):
+        """
+        :param k: int, accuracy parameter; derived from error when not given
+        :param error: float, target normalised rank error (0.01 means +/- 1% of the ranks)
+        :param c: float, capacity ratio between adjacent levels
+        :param seed: optional int seed (or random.Random) for the compaction coin, for
+            reproducible sketches; many sketches can share one random.Random
+        """
+        self.k = k or self.k_for_error(error)
+        self.c = c
+        self.count = 0
+        self._levels = [_Compactor()]
+        self._size = 0
+        if seed is None:
+            self._rng = _rng
+        else:
+            self._rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+        self._max_size = self._capacity(0)
+
+    @staticmethod
+    def k_for_error(error):
+        # empirical rank error of KLL is about 1.65 / k ** 0.96
+        if not 0 < error < 1:
+            raise ValueError("error must be between 0 and 1")
+        return max(8, math.ceil((1.65 / error) ** (1 / 0.96)))
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _grow(self):
+        self._levels.append(_Compactor())
+        self._max_size = sum(self._capacity(level) for level in range(len(self._levels)))
+
+    def _compress(self):
+        for level in range(len(self._levels)):
+            if len(self._levels[level]) >= self._capacity(level):
+                if level + 1 >= len(self._levels):
+                    self._grow()
+                self._levels[level + 1].extend(self._levels[level].compact(self._rng))
+                self._size = sum(len(items) for items in self._levels)
+                if self._size < self._max_size:
+                    break
+
+    def add(self, value):
+        self._levels[0].append(value)
+        self._size += 1
+        self.count += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other):
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self.count += other.count
+        self._size = sum(len(items) for items in self._levels)
+        while self._size >= self._max_size:
+            self._compress()
+        return self
+
+    def _weighted(self):
+        weighted = [(value, 1 << level) for level, items in enumerate(self._levels) for value in items]
+        weighted.sort()
+        return weighted
+
+    def quantile(self, q):
+        """
+        :param q: float between 0 and 1, e.g. 0.5 for the median
+        :return: float, NaN for an empty sketch
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        weighted = self._weighted()
+        if not weighted:
+            return [math.nan] * len(qs)
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValueError("Quantiles are between 0 and 1, got %r" % (q,))
+            target = q * total
+            cumulative = 0
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    break
+            results.append(value)
+        return results
+
+    def rank(self, value):
+        """
+        :return: float, approximate fraction of the values <= value
+        """
+        weighted = self._weighted()
+        total = sum(weight for _, weight in weighted)
+        below = sum(weight for item, weight in weighted if item <= value)
+        return below / total if total else math.nan
+
+    def __len__(self):
+        # items retained, not items seen (see count)
+        return self._size
+
+
+class StreamStats:
+    """
+    Moments plus a quantile sketch for one stream of values.
+    """
+    __slots__ = ('moments', 'sketch')
+
+    def __init__(self, error=0.01, seed=None):
+        self.moments = Moments()
+        self.sketch = KLLSketch(error=error, seed=seed)
+
+    def add(self, value):
+        self.moments.add(value)
+        self.sketch.add(value)
+
+    def extend(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        """
+        :return: dict with count, mean, stddev, min, max and the requested quantiles,
+            e.g. 'median' for 0.5 and 'p90' for 0.9
+        """
+        moments = self.moments
+        empty = not moments.count
+        summary = {
+            'count': moments.count,
+            'mean': math.nan if empty else moments.mean,
+            'stddev': moments.stddev(),
+            'min': math.nan if empty else moments.min,
+            'max': math.nan if empty else moments.max,
+        }
+        for q, value in zip(quantiles, self.sketch.quantiles(quantiles)):
+            summary['median' if q == 0.5 else 'p%g' % (q * 100)] = value
+        return summary
+
+
+class GradeStats:
+    """
+    StreamStats per student and for the whole cohort, fed one grade at a time.
+    """
+
+    def __init__(self, error=0.01, seed=None):
+        self.error = error
+        # one generator for all the students' sketches, a Random object is a few KB
+        self.seed = random.Random(seed) if seed is not None else None
+        self.cohort = StreamStats(error, self.seed)
+        self.students = {}
+
+    def add(self, name, grade):
+        """
+        :param name: [first, last] or any hashable student key
+        :param grade: float
+        """
+        key = tuple(name) if isinstance(name, list) else name
+        stats = self.students.get(key)
+        if stats is None:
+            stats = self.students[key] = StreamStats(self.error, self.seed)
+        stats.add(grade)
+        self.cohort.add(grade)
+
+    def add_rows(self, grades):
+        """
+        :param grades: iterable in the Script.py shape, [[first, last], [scores...]] rows
+        """
+        for name, student_grades in grades:
+            key = tuple(name)
+            if key not in self.students:
+                self.students[key] = StreamStats(self.error, self.seed)
+            for grade in student_grades:
+                self.add(key, grade)
+        return self
+
+    def merge(self, other):
+        # students seen in several shards are merged too
+        self.cohort.merge(other.cohort)
+        for key, stats in other.students.items():
+            mine = self.students.get(key)
+            if mine is None:
+                mine = self.students[key] = StreamStats(self.error, self.seed)
+            mine.merge(stats)
+        return self
+
+    def get_stats(self, quantiles=(0.5, 0.9, 0.99)):
+        """
+        :return: list, [[[first, last], summary dict], ...]; a student with no grades gets
+            NaN statistics instead of the ZeroDivisionError / AssertionError of avg
+        """
+        return [[list(key) if isinstance(key, tuple) else key, stats.summary(quantiles)]
+                for key, stats in self.students.items()]
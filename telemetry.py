@@ -0,0 +1,223 @@
+"""
+Call counts, exception counts and latency histograms for the lesson's functions.
+
+The lesson catches ZeroDivisionError, ValueError and AssertionError and only prints a message,
+so there is no record of how often each path fires. install() wraps avg, get_stats,
+apply_discount, name_validated, age_validated and register; every call then updates the
+statistics of the calling thread, without locks, and snapshot() merges the threads on read.
+
+    import telemetry
+    telemetry.install()
+    ...
+    telemetry.telemetry.write_prometheus('/var/lib/node_exporter/lesson.prom')
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+# upper bounds of the latency buckets in seconds, 1us to 10s; slower calls land in +Inf
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3,
+                   2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+INSTRUMENTED = {
+    'lesson': ('avg', 'get_stats', 'apply_discount', 'name_validated', 'age_validated'),
+    'registration': ('name_validated', 'age_validated', 'register'),
+}
+
+
+class _Stats:
+    # statistics of one function in one thread, only ever written by that thread
+    __slots__ = ('calls', 'exceptions', 'buckets', 'seconds')
+
+    def __init__(self, size):
+        self.calls = 0
+        self.exceptions = {}
+        self.buckets = [0] * size
+        self.seconds = 0.0
+
+
+class Telemetry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(buckets)
+        self._local = threading.local()
+        self._tables = []  # (weak reference to the thread, {function name: _Stats}) per live thread
+        self._retired = {}  # statistics of the threads that have exited, merged
+        self._lock = threading.Lock()  # only taken when a thread records for the first time
+
+    def _stats(self, name):
+        try:
+            table = self._local.table
+        except AttributeError:
+            table = self._local.table = {}
+            with self._lock:
+                self._retire_dead()
+                self._tables.append((weakref.ref(threading.current_thread()), table))
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = _Stats(len(self.bounds) + 1)
+        return stats
+
+    def wrap(self, func, name=None):
+        """
+        :return: func wrapped so every call is counted and timed under name
+        """
+        name = name or func.__name__
+        bounds = self.bounds
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def instrumented(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except BaseException as exc:
+                stats = self._stats(name)
+                kind = type(exc).__name__
+                stats.exceptions[kind] = stats.exceptions.get(kind, 0) + 1
+                raise
+            finally:
+                elapsed = perf_counter() - start
+                stats = self._stats(name)
+                stats.calls += 1
+                stats.seconds += elapsed
+                stats.buckets[bisect_left(bounds, elapsed)] += 1
+
+        instrumented.__wrapped__ = func
+        return instrumented
+
+    def _merge(self, merged, table):
+        for name, stats in list(table.items()):
+            total = merged.get(name)
+            if total is None:
+                total = merged[name] = _Stats(len(self.bounds) + 1)
+            total.calls += stats.calls
+            total.seconds += stats.seconds
+            for kind, count in list(stats.exceptions.items()):
+                total.exceptions[kind] = total.exceptions.get(kind, 0) + count
+            for i, count in enumerate(stats.buckets):
+                total.buckets[i] += count
+
+    def _retire_dead(self):
+        # caller holds the lock; a thread that has exited no longer writes its table, so it
+        # can be folded into the retired totals and dropped (thread pools come and go)
+        live = []
+        for ref, table in self._tables:
+            thread = ref()
+            if thread is not None and thread.is_alive():
+                live.append((ref, table))
+            else:
+                self._merge(self._retired, table)
+        self._tables = live
+
+    def snapshot(self):
+        """
+        Merge the per-thread statistics.
+        :return: dict, {function: {'calls', 'exceptions': {type: count}, 'seconds',
+            'buckets': [[upper bound, cumulative count], ..., ['+Inf', calls]]}}
+        """
+        merged = {}
+        with self._lock:
+            self._retire_dead()
+            tables = [table for _, table in self._tables]
+            self._merge(merged, self._retired)
+        for table in tables:
+            self._merge(merged, table)
+
+        snapshot = {}
+        for name, total in sorted(merged.items()):
+            cumulative, buckets = 0, []
+            for bound, count in zip(self.bounds + ('+Inf',), total.buckets):
+                cumulative += count
+                buckets.append([bound, cumulative])
+            snapshot[name] = {
+                'calls': total.calls,
+                'exceptions': dict(sorted(total.exceptions.items())),
+                'seconds': total.seconds,
+                'buckets': buckets,
+            }
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._retired = {}
+            for _, table in self._tables:
+                table.clear()
+
+    def prometheus(self, prefix='lesson'):
+        """
+        :return: str, snapshot in the Prometheus text exposition format
+        """
+        lines = [
+            '# HELP %s_calls_total Calls per function.' % prefix,
+            '# TYPE %s_calls_total counter' % prefix,
+        ]
+        snapshot = self.snapshot()
+        for name, stats in snapshot.items():
+            lines.append('%s_calls_total{function="%s"} %d' % (prefix, name, stats['calls']))
+        lines += [
+            '# HELP %s_exceptions_total Exceptions raised per function and type.' % prefix,
+            '# TYPE %s_exceptions_total counter' % prefix,
+        ]
+        for name, stats in snapshot.items():
+            for kind, count in stats['exceptions'].items():
+                lines.append('%s_exceptions_total{function="%s",exception="%s"} %d' % (prefix, name, kind, count))
+        lines += [
+            '# HELP %s_latency_seconds Call latency per function.' % prefix,
+            '# TYPE %s_latency_seconds histogram' % prefix,
+        ]
+        for name, stats in snapshot.items():
+            for bound, count in stats['buckets']:
+                lines.append('%s_latency_seconds_bucket{function="%s",le="%s"} %d' % (prefix, name, bound, count))
+            lines.append('%s_latency_seconds_sum{function="%s"} %r' % (prefix, name, stats['seconds']))
+            lines.append('%s_latency_seconds_count{function="%s"} %d' % (prefix, name, stats['calls']))
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, prefix='lesson'):
+        # written to a temporary file and renamed, so a collector never reads half a file
+        _write_atomic(path, self.prometheus(prefix))
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.snapshot(), indent=2) + '\n')
+
+
+def _write_atomic(path, text):
+    tmp = '%s.tmp%d' % (path, os.getpid())
+    with open(tmp, 'w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(tmp, path)
+
+
+telemetry = Telemetry()
+_originals = {}
+
+
+def install(target=None):
+    """
+    Wrap the lesson's functions (see INSTRUMENTED) so they report to target.
+    :param target: Telemetry, the module-level telemetry by default
+    """
+    import importlib
+
+    target = telemetry if target is None else target
+    uninstall()
+    wrapped = {}
+    for module_name, names in INSTRUMENTED.items():
+        module = importlib.import_module(module_name)
+        for name in names:
+            func = getattr(module, name)
+            # a function re-exported by several modules gets one wrapper, counted once
+            if func not in wrapped:
+                wrapped[func] = target.wrap(func, name)
+            _originals[(module, name)] = func
+            setattr(module, name, wrapped[func])
+
+
+def uninstall():
+    for (module, name), func in _originals.items():
+        setattr(module, name, func)
+    _originals.clear()
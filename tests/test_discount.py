@@ -0,0 +1,35 @@
+import random
+import unittest
+
+import _numpy
+import lesson
+from discount import apply_discount_bulk
+
+
+class ApplyDiscountBulkTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.prices = [round(rng.uniform(1, 200), 2) for _ in range(20000)] + [73.55, 167.37]
+        self.discounts = [rng.choice([10, 25, 33, 50, 75]) for _ in range(20000)] + [50, 50]
+
+    def expected(self):
+        return [lesson.apply_discount({'price': price}, discount)
+                for price, discount in zip(self.prices, self.discounts)]
+
+    def test_matches_apply_discount_item_by_item(self):
+        batch = apply_discount_bulk(self.prices, self.discounts)
+        self.assertEqual(list(batch.prices), self.expected())
+
+    def test_python_fallback_matches_apply_discount(self):
+        saved = _numpy._numpy
+        _numpy._numpy = None
+        try:
+            batch = apply_discount_bulk(self.prices, self.discounts)
+        finally:
+            _numpy._numpy = saved
+        self.assertEqual(list(batch.prices), self.expected())
+
+
+if __name__ == '__main__':
+    unittest.main()
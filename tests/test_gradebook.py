@@ -0,0 +1,45 @@
+import random
+import unittest
+
+import _numpy
+from gradebook import ColumnarGradebook, parallel_get_stats
+from lesson import avg_or_zero, get_stats
+
+
+def make_grades(students, max_grades, seed=0):
+    rng = random.Random(seed)
+    return [[['Student', str(i)], [rng.uniform(0, 100) for _ in range(rng.randint(0, max_grades))]]
+            for i in range(students)]
+
+
+class ParallelGetStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.grades = make_grades(3000, 12)
+        self.expected = get_stats(self.grades, avg=avg_or_zero)
+
+    def test_nested_matches_get_stats(self):
+        for workers in (1, 2):
+            self.assertEqual(parallel_get_stats(self.grades, workers=workers, fill=0.0), self.expected)
+
+    def test_columnar_matches_get_stats(self):
+        book = ColumnarGradebook.from_nested(self.grades)
+        for workers in (1, 2):
+            self.assertEqual(parallel_get_stats(book, workers=workers, fill=0.0), self.expected)
+
+    def test_columnar_python_fallback_matches_get_stats(self):
+        saved = _numpy._numpy
+        _numpy._numpy = None
+        try:
+            book = ColumnarGradebook.from_nested(self.grades)
+            stats = parallel_get_stats(book, workers=2, fill=0.0)
+        finally:
+            _numpy._numpy = saved
+        self.assertEqual(stats, self.expected)
+
+    def test_empty_cohort(self):
+        self.assertEqual(parallel_get_stats([], workers=2), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
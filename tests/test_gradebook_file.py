@@ -0,0 +1,54 @@
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import cli
+from gradebook_file import GradebookFile, append_term, write_gradebook
+from lesson import avg_or_zero, get_stats
+
+
+class GradebookFileStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.directory = tempfile.TemporaryDirectory()
+        self.gbk_path = os.path.join(self.directory.name, 'cohort.gbk')
+        self.json_path = os.path.join(self.directory.name, 'cohort.json')
+        terms = [[[['Student', str(i)], [rng.uniform(0, 100) for _ in range(rng.randint(0, 6))]]
+                  for i in range(500)] for _ in range(3)]
+        write_gradebook(self.gbk_path, terms[0])
+        for term in terms[1:]:
+            append_term(self.gbk_path, term)
+        self.grades = [[name, [grade for term in terms for grade in term[i][1]]]
+                       for i, (name, _) in enumerate(terms[0])]
+        with open(self.json_path, 'w', encoding='utf-8') as file:
+            json.dump(self.grades, file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_stats_matches_lesson_get_stats(self):
+        with GradebookFile(self.gbk_path) as gradebook:
+            self.assertEqual(gradebook.get_stats(fill=0.0), get_stats(self.grades, avg=avg_or_zero))
+
+    def test_averages_match_get_stats(self):
+        expected = [average for _, _, average in get_stats(self.grades, avg=avg_or_zero)]
+        with GradebookFile(self.gbk_path) as gradebook:
+            self.assertEqual([float(average) for average in gradebook.averages(fill=0.0)], expected)
+
+    def stats_output(self, path):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            cli.main(['stats', path, '--fill', '0.0'])
+        return out.getvalue()
+
+    def test_cli_stats_agree_on_json_and_gbk(self):
+        self.assertEqual(self.stats_output(self.gbk_path), self.stats_output(self.json_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+import _numpy
+from money import apply_discount_minor_bulk, rate
+
+
+class ApplyDiscountMinorBulkTest(unittest.TestCase):
+
+    def check_both_paths(self, test):
+        test()
+        saved = _numpy._numpy
+        _numpy._numpy = None
+        try:
+            test()
+        finally:
+            _numpy._numpy = saved
+
+    def test_rates_must_match_prices(self):
+        def test():
+            with self.assertRaisesRegex(ValueError, "2 discount rates for 3 prices"):
+                apply_discount_minor_bulk([7999, 999, 2400], [rate(25), rate(10)])
+        self.check_both_paths(test)
+
+    def test_skus_must_match_prices(self):
+        def test():
+            with self.assertRaisesRegex(ValueError, "1 SKUs for 2 prices"):
+                apply_discount_minor_bulk([7999, 999], rate(25), skus=['Trainers'])
+        self.check_both_paths(test)
+
+    def test_offenders_are_reported_by_sku(self):
+        def test():
+            batch = apply_discount_minor_bulk([7999, 999], [rate(25), rate(200)], skus=['Trainers', 'Socks'])
+            self.assertEqual(list(batch.prices), [5999, 999])
+            self.assertEqual(list(batch.offending), ['Socks'])
+        self.check_both_paths(test)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from registration import RegistrationLog
+from registration_reader import RegistrationReader
+
+
+class RegistrationLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'registration_file.txt')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self):
+        with open(self.path, encoding='utf-8') as file:
+            return file.read()
+
+    def test_appends_after_a_practice_file_without_newline(self):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write("New member name: Hassan,Munir and age 15")
+        with RegistrationLog(self.path, flush_interval=None) as log:
+            log.write("Rehana,Soltane", 16)
+        self.assertEqual(self.read(), "New member name: Hassan,Munir and age 15\n"
+                                      "New member name: Rehana,Soltane and age 16\n")
+        with RegistrationReader(self.path) as reader:
+            self.assertEqual(reader.lookup("Hassan,Munir"), ("Hassan,Munir", 15))
+            self.assertEqual(reader.lookup("Rehana,Soltane"), ("Rehana,Soltane", 16))
+
+    def test_no_extra_newline(self):
+        with RegistrationLog(self.path, flush_interval=None) as log:
+            log.write("Hassan,Munir", 15)
+        with RegistrationLog(self.path, flush_interval=None) as log:
+            log.write("Rehana,Soltane", 16)
+        self.assertEqual(self.read(), "New member name: Hassan,Munir and age 15\n"
+                                      "New member name: Rehana,Soltane and age 16\n")
+
+    def test_file_is_untouched_without_records(self):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write("New member name: Hassan,Munir and age 15")
+        RegistrationLog(self.path, flush_interval=None).close()
+        self.assertEqual(self.read(), "New member name: Hassan,Munir and age 15")
+
+
+if __name__ == '__main__':
+    unittest.main()
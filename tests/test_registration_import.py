@@ -0,0 +1,37 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from registration_import import import_registrations
+
+
+class ImportErrorPathTest(unittest.TestCase):
+
+    def test_failing_reject_sink_stops_the_pipeline(self):
+        rows = ''.join('"Name%d,Surname%d",%d\n' % (i, i, 25) for i in range(200000))
+
+        def reject(line_no, name, age, reason):
+            raise RuntimeError("reject sink failed")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'registration_file.txt')
+            outcome = []
+
+            def run():
+                try:
+                    import_registrations(io.StringIO(rows), path, chunk_size=100, queue_size=2, rejects=reject)
+                except RuntimeError as exc:
+                    outcome.append(exc)
+
+            worker = threading.Thread(target=run, daemon=True)
+            worker.start()
+            worker.join(20)
+            self.assertFalse(worker.is_alive(), "import_registrations hung after a stage 3 error")
+            self.assertEqual(len(outcome), 1)
+            self.assertEqual(str(outcome[0]), "reject sink failed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from registration_reader import RegistrationReader
+
+
+def record(name, age):
+    return "New member name: %s and age %d\n" % (name, age)
+
+
+class RegistrationReaderIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'registration_file.txt')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text, mode='w'):
+        with open(self.path, mode, encoding='utf-8') as file:
+            file.write(text)
+
+    def replace(self, text):
+        # a new file under the same name, as an editor or a restore would leave it
+        temporary = self.path + '.new'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(text)
+        os.replace(temporary, self.path)
+
+    def index_names(self):
+        with open(self.path + '.idx', 'rb') as index:
+            index.readline()
+            return sorted(line.rstrip(b"\n").partition(b"\t")[2].decode('utf-8') for line in index)
+
+    def test_appended_records_are_indexed_on_reopen(self):
+        self.write(record("Hassan,Munir", 15))
+        RegistrationReader(self.path).close()
+        self.write(record("Rehana,Soltane", 16), 'a')
+        with RegistrationReader(self.path) as reader:
+            self.assertEqual(reader.lookup("Rehana,Soltane"), ("Rehana,Soltane", 16))
+            self.assertIn("Hassan,Munir", reader)
+        self.assertEqual(self.index_names(), ["Hassan,Munir", "Rehana,Soltane"])
+
+    def test_truncated_file_rewrites_the_index(self):
+        self.write(record("Hassan,Munir", 15) + record("Rehana,Soltane", 16))
+        RegistrationReader(self.path).close()
+        self.write(record("Ana,Lee", 14))
+        with RegistrationReader(self.path) as reader:
+            self.assertNotIn("Hassan,Munir", reader)
+            self.assertEqual(reader.lookup("Ana,Lee"), ("Ana,Lee", 14))
+        self.assertEqual(self.index_names(), ["Ana,Lee"])
+
+    def test_same_size_replacement_is_detected(self):
+        self.write(record("Hassan,Munir", 15))
+        RegistrationReader(self.path).close()
+        self.replace(record("Nassah,Rinum", 17))
+        with RegistrationReader(self.path) as reader:
+            self.assertNotIn("Hassan,Munir", reader)
+            self.assertEqual(reader.lookup("Nassah,Rinum"), ("Nassah,Rinum", 17))
+        self.assertEqual(self.index_names(), ["Nassah,Rinum"])
+
+    def test_larger_replacement_is_detected_while_open(self):
+        self.write(record("Hassan,Munir", 15))
+        with RegistrationReader(self.path) as reader:
+            self.replace(record("Ana,Lee", 14) + record("Rehana,Soltane", 16))
+            reader.refresh()
+            self.assertNotIn("Hassan,Munir", reader)
+            self.assertEqual(reader.lookup("Ana,Lee"), ("Ana,Lee", 14))
+            self.assertEqual(reader.lookup("Rehana,Soltane"), ("Rehana,Soltane", 16))
+        self.assertEqual(self.index_names(), ["Ana,Lee", "Rehana,Soltane"])
+
+    def test_practice_file_without_newlines(self):
+        self.write("New member name: Hassan,Munir and age 15New member name: Ana,Lee and age 14")
+        with RegistrationReader(self.path) as reader:
+            self.assertEqual(reader.lookup("Ana,Lee"), ("Ana,Lee", 14))
+            self.assertEqual(len(reader), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from registration_server import AsyncRegistrationLog
+
+
+class AsyncRegistrationLogCloseTest(unittest.TestCase):
+
+    def test_close_commits_queued_records(self):
+        async def run(path):
+            log = AsyncRegistrationLog(path, fsync='never', max_batch=16)
+            log.start()
+            writes = [asyncio.ensure_future(log.write("Name%d,Surname" % i, 15)) for i in range(200)]
+            await asyncio.sleep(0)  # every write is queued, the first group is being committed
+            await log.close()
+            await asyncio.gather(*writes)
+            with self.assertRaises(ValueError):
+                await log.write("Late,Comer", 15)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'registration_file.txt')
+            asyncio.run(run(path))
+            with open(path, encoding='utf-8') as file:
+                lines = file.read().splitlines()
+        self.assertEqual(lines, ["New member name: Name%d,Surname and age 15" % i for i in range(200)])
+
+
+if __name__ == '__main__':
+    unittest.main()
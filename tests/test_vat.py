@@ -0,0 +1,26 @@
+import io
+import unittest
+
+from vat import stream_add_vat
+
+
+class StreamAddVatTest(unittest.TestCase):
+
+    def test_short_rows_are_rejected(self):
+        rejects = []
+        source = io.StringIO("sku,price\nA,24\n12.5\n\nB,10,extra\nC,ten\n")
+        prices = list(stream_add_vat(20, source, column=1, header=True,
+                                     rejects=lambda line_no, value: rejects.append((line_no, value))))
+        self.assertEqual(prices, [28.8, 12.0])
+        self.assertEqual(rejects, [(3, '12.5'), (6, 'ten')])
+
+    def test_one_price_per_line(self):
+        rejects = []
+        prices = list(stream_add_vat(20, ["24\n", "\n", "x\n", "0.15\n"],
+                                     rejects=lambda line_no, value: rejects.append(line_no)))
+        self.assertEqual(prices, [28.8, 0.18])
+        self.assertEqual(rejects, [3])
+
+
+if __name__ == '__main__':
+    unittest.main()
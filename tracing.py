@@ -0,0 +1,143 @@
+"""
+Conditional, sampled trace points to use instead of breakpoint() in hot loops.
+
+debugging_n_breakpoints in Script.py stops on every loop iteration, which can never run in
+production. A trace point records a few values into a ring buffer instead, and only when it
+is switched on; the instrumented loops check point.on once per call, so a disabled trace
+point costs one attribute lookup per call, not per item.
+
+    from tracing import tracer
+    tracer.enable('add_vat', when=lambda price: price > 1000, every=10)
+    with tracer.dump_on_error():
+        add_vat(20, prices)
+    tracer.dump()
+"""
+
+import sys
+import time
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer keeping the most recent records; older ones are overwritten.
+    """
+
+    def __init__(self, capacity=4096):
+        if capacity < 1:
+            raise ValueError("capacity must be a positive number")
+        self.capacity = capacity
+        self._records = [None] * capacity
+        self._next = 0
+        self.total = 0  # records ever appended, including overwritten ones
+
+    def append(self, record):
+        self._records[self._next] = record
+        self._next = (self._next + 1) % self.capacity
+        self.total += 1
+
+    def records(self):
+        """
+        :return: list of the buffered records, oldest first
+        """
+        if self.total < self.capacity:
+            return self._records[:self._next]
+        return self._records[self._next:] + self._records[:self._next]
+
+    def clear(self):
+        self._records = [None] * self.capacity
+        self._next = 0
+        self.total = 0
+
+
+class TracePoint:
+    """
+    A named place in a loop. Call it with the values to record, but only when point.on is True.
+    """
+    __slots__ = ('name', 'on', 'when', 'every', 'hits', '_buffer')
+
+    def __init__(self, name, buffer):
+        self.name = name
+        self.on = False
+        self.when = None
+        self.every = 1
+        self.hits = 0
+        self._buffer = buffer
+
+    def __call__(self, *values):
+        self.hits += 1
+        if self.every > 1 and self.hits % self.every:
+            return
+        if self.when is not None and not self.when(*values):
+            return
+        self._buffer.append((time.perf_counter_ns(), self.name, values))
+
+
+class Tracer:
+    def __init__(self, capacity=4096):
+        self.buffer = RingBuffer(capacity)
+        self._points = {}
+
+    def point(self, name):
+        """
+        :return: the TracePoint with this name, created (switched off) on first use
+        """
+        point = self._points.get(name)
+        if point is None:
+            point = self._points[name] = TracePoint(name, self.buffer)
+        return point
+
+    def enable(self, name, when=None, every=1):
+        """
+        :param name: str, trace point name
+        :param when: optional predicate on the traced values, e.g. lambda price: price > 100
+        :param every: int, keep 1 in every N hits (sampling)
+        """
+        if every < 1:
+            raise ValueError("every must be a positive number")
+        point = self.point(name)
+        point.when = when
+        point.every = every
+        point.hits = 0
+        point.on = True
+
+    def disable(self, name=None):
+        # one trace point, or all of them when no name is given
+        for point in ([self.point(name)] if name is not None else self._points.values()):
+            point.on = False
+
+    def dump(self, file=None):
+        """
+        :param file: optional text file the records are written to, one per line
+        :return: list of (time_ns, name, values) records, oldest first
+        """
+        records = self.buffer.records()
+        if file is not None:
+            for time_ns, name, values in records:
+                file.write("%d %s %r\n" % (time_ns, name, values))
+        return records
+
+    def dump_on_error(self, file=None):
+        """
+        Context manager writing the buffered records to file (stderr by default) if the
+        block raises.
+        """
+        return _DumpOnError(self, file)
+
+
+class _DumpOnError:
+    # a plain class rather than contextlib.contextmanager, which would double the import time
+
+    def __init__(self, tracer, file):
+        self.tracer = tracer
+        self.file = file
+
+    def __enter__(self):
+        return self.tracer
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.tracer.dump(sys.stderr if self.file is None else self.file)
+        return False
+
+
+tracer = Tracer()
@@ -0,0 +1,309 @@
+"""
+Batch version of add_vat from Script.py.
+
+add_vat(vat, prices) uses a list comprehension, so a single bad item (like the '10' string
+in the lesson's BAD INPUT) raises a TypeError and the whole batch is lost. The functions
+below price the whole batch in one pass and report the bad items instead of raising.
+"""
+
+import os
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import date
+from numbers import Real
+
+from _numpy import numpy_or_none
+
+# prices: output buffer with vat added (NaN for rejected items)
+# valid: mask, True/1 where the item was priced
+# rejected: indices of the items that could not be priced
+VatBatch = namedtuple('VatBatch', ['prices', 'valid', 'rejected'])
+
+
+def _is_price(price):
+    # same items add_vat accepts, minus NaN which would silently poison the totals
+    return isinstance(price, Real) and price == price
+
+
+def _new_buffer(size):
+    np = numpy_or_none()
+    if np is not None:
+        return np.empty(size, dtype=np.float64)
+    return array('d', bytes(8 * size))
+
+
+def _float_view(prices):
+    """
+    Zero-copy float64 view over a numeric buffer.
+    :param prices: ndarray or array('d')
+    :return: ndarray, or None if the items have to be checked one by one
+    """
+    np = numpy_or_none()
+    if isinstance(prices, np.ndarray) and prices.dtype.kind in 'fiu':
+        return prices.astype(np.float64, copy=False)
+    if isinstance(prices, array) and prices.typecode == 'd':
+        return np.frombuffer(prices, dtype=np.float64)
+    return None
+
+
+def _add_vat_numpy(vat, prices, out):
+    np = numpy_or_none()
+    src = _float_view(prices)
+    if src is None:
+        # mixed content (e.g. a list with strings): check and copy every item once
+        src = np.empty(len(prices), dtype=np.float64)
+        valid = np.empty(len(prices), dtype=bool)
+        for i, price in enumerate(prices):
+            ok = _is_price(price)
+            valid[i] = ok
+            src[i] = price if ok else np.nan
+    else:
+        valid = ~np.isnan(src)
+    if not isinstance(vat, Real):
+        vat = np.asarray(vat, dtype=np.float64)
+        valid &= ~np.isnan(vat)  # NaN marks an item without a rate
+
+    if out is None:
+        out = np.empty(len(src), dtype=np.float64)
+    dst = np.frombuffer(out, dtype=np.float64) if isinstance(out, array) else out
+
+    # same operation order as add_vat: (price / 100 * vat) + price
+    if np.shares_memory(dst, src):
+        np.add(src / 100 * vat, src, out=dst)
+    else:
+        np.divide(src, 100, out=dst)
+        np.multiply(dst, vat, out=dst)
+        np.add(dst, src, out=dst)
+
+    rejected = np.flatnonzero(~valid)
+    dst[rejected] = np.nan
+    return VatBatch(out, valid, rejected)
+
+
+def _add_vat_python(vat, prices, out):
+    if out is None:
+        out = _new_buffer(len(prices))
+    valid = bytearray(len(prices))
+    rejected = []
+    per_item = not isinstance(vat, Real)
+    for i, price in enumerate(prices):
+        item_vat = vat[i] if per_item else vat
+        if _is_price(price) and item_vat == item_vat:
+            out[i] = (price / 100 * item_vat) + price
+            valid[i] = 1
+        else:
+            out[i] = float('nan')
+            rejected.append(i)
+    return VatBatch(out, valid, rejected)
+
+
+def add_vat_batch(vat, prices, out=None):
+    """
+    Add vat to every price item in one vectorised pass, without raising on bad items.
+    :param vat: float vat percentage, or one percentage per item (NaN rejects the item)
+    :param prices: sequence, ndarray or array('d') of net prices
+    :param out: optional ndarray or array('d') of the same length to write the results into
+    :return: VatBatch(prices, valid, rejected)
+    Bad items (non numbers and NaN) are set to NaN in the output, flagged in the valid mask
+    and listed in rejected. Good items are computed exactly as add_vat does.
+    """
+    np = numpy_or_none()
+    if out is not None and len(out) != len(prices):
+        raise ValueError("Output buffer has %d items, expected %d" % (len(out), len(prices)))
+    if not isinstance(vat, Real) and len(vat) != len(prices):
+        raise ValueError("Got %d vat rates for %d prices" % (len(vat), len(prices)))
+
+    if np is not None:
+        return _add_vat_numpy(vat, prices, out)
+    return _add_vat_python(vat, prices, out)
+
+
+# add_vat_batch(vat=20, prices=[24, 0.15, '10', 32.45])
+# --> prices [28.8, 0.18, nan, 38.94], rejected [2]
+
+
+class RateTable:
+    """
+    VAT rates by (category, region) key, each with effective-date ranges.
+    The ranges of every key are kept sorted, so finding the rate on a date is a bisect, and
+    resolved (key, date) pairs are cached, so pricing a basket costs one dict lookup per item.
+    """
+
+    def __init__(self, rates=()):
+        """
+        :param rates: iterable of (category, region, vat, start, end) rows, see add()
+        """
+        self._starts = {}  # key -> sorted range starts
+        self._ranges = {}  # key -> [(start, end, vat)], same order
+        self._cache = {}
+        for row in rates:
+            self.add(*row)
+
+    def add(self, category, region, vat, start=None, end=None):
+        """
+        :param vat: float, vat percentage
+        :param start: date the rate applies from (inclusive), None for always
+        :param end: date the rate applies until (exclusive), None for no end
+        """
+        start = start or date.min
+        end = end or date.max
+        if start >= end:
+            raise ValueError("Empty date range %s - %s" % (start, end))
+        key = (category, region)
+        starts = self._starts.setdefault(key, [])
+        ranges = self._ranges.setdefault(key, [])
+        i = bisect_right(starts, start)
+        if (i and ranges[i - 1][1] > start) or (i < len(ranges) and ranges[i][0] < end):
+            raise ValueError("Overlapping rates for %s %s from %s" % (category, region, start))
+        starts.insert(i, start)
+        ranges.insert(i, (start, end, vat))
+        self._cache.clear()
+
+    def rate(self, category, region, on=None):
+        """
+        :param on: date, today by default
+        :return: float vat percentage, or None if no rate applies
+        """
+        on = on or date.today()
+        cached = self._cache.get((category, region, on), self)
+        if cached is not self:
+            return cached
+        vat = None
+        key = (category, region)
+        starts = self._starts.get(key)
+        if starts:
+            i = bisect_right(starts, on) - 1
+            if i >= 0 and on < self._ranges[key][i][1]:
+                vat = self._ranges[key][i][2]
+        self._cache[(category, region, on)] = vat
+        return vat
+
+    def rates_for(self, keys, on=None):
+        """
+        :param keys: sequence of (category, region) pairs, one per item
+        :param on: date, today by default
+        :return: float64 buffer of vat percentages, NaN where no rate applies
+        """
+        on = on or date.today()
+        resolved = {}
+        nan = float('nan')
+        rates = array('d', bytes(8 * len(keys)))
+        for i, key in enumerate(keys):
+            vat = resolved.get(key)
+            if vat is None:
+                vat = self.rate(key[0], key[1], on)
+                vat = resolved[key] = nan if vat is None else vat
+            rates[i] = vat
+        return rates
+
+
+def add_vat_multi(prices, keys, rate_table, on=None, out=None):
+    """
+    Price a mixed basket in one pass: every item gets the rate of its (category, region) key.
+    :param prices: sequence, ndarray or array('d') of net prices
+    :param keys: sequence of (category, region) pairs aligned with prices
+    :param rate_table: RateTable
+    :param on: date the rates are taken at, today by default
+    :param out: optional ndarray or array('d') to write the results into
+    :return: VatBatch(prices, valid, rejected); items without a rate are rejected like bad prices
+    """
+    if len(keys) != len(prices):
+        raise ValueError("Got %d keys for %d prices" % (len(keys), len(prices)))
+    return add_vat_batch(rate_table.rates_for(keys, on), prices, out)
+
+
+# rates = RateTable([('standard', 'UK', 20), ('reduced', 'UK', 5), ('zero', 'UK', 0),
+#                    ('standard', 'IE', 23, date(2021, 3, 1)), ('standard', 'IE', 21, None, date(2021, 3, 1))])
+# add_vat_multi([24, 10, 32.45], [('standard', 'UK'), ('reduced', 'UK'), ('standard', 'IE')], rates)
+# --> prices [28.8, 10.5, 39.9135]
+
+
+def _rows(source, column, delimiter, header):
+    # (line number, value, short) from a file path, an open file or any iterable of prices;
+    # short is True for a CSV row without the price column
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline='') as file:
+            yield from _rows(file, column, delimiter, header)
+        return
+
+    if column is not None:
+        import csv  # only CSV feeds pay for the csv (and re) import
+        source = csv.reader(source, delimiter=delimiter)
+    for line_no, row in enumerate(source, 1):
+        if header and line_no == 1:
+            continue
+        short = False
+        if column is not None:
+            if len(row) > column:
+                row = row[column]
+            else:
+                # kept whole for the reject sink, never parsed: '12.5' alone is not column 1
+                row = delimiter.join(row)
+                short = bool(row.strip())
+        yield line_no, row, short
+
+
+def _reject_writer(rejects):
+    if rejects is None:
+        return lambda line_no, value: None
+    if callable(rejects):
+        return rejects
+    return lambda line_no, value: rejects.write("%d,%s\n" % (line_no, str(value).strip()))
+
+
+def stream_add_vat(vat, prices, chunk_size=65536, rejects=None, column=None, delimiter=',', header=False):
+    """
+    Add vat to a stream of prices with bounded memory, one chunk at a time.
+    :param vat: float, vat percentage
+    :param prices: iterable of prices, an open text file or a path to a line/CSV file
+    :param chunk_size: int, number of prices held in memory at once
+    :param rejects: optional callback(line_no, value) or writable file for malformed rows
+    :param column: int, CSV column holding the price; None reads one price per line
+    :param delimiter: str, CSV delimiter
+    :param header: bool, skip the first line
+    :return: generator of prices with added vat, in input order, malformed rows left out
+    Text rows are parsed with float(); blank lines are skipped and CSV rows without the
+    price column are rejected. Line numbers start at 1.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive number")
+    reject = _reject_writer(rejects)
+
+    chunk, line_nos = [], []
+    for line_no, value, short in _rows(prices, column, delimiter, header):
+        if short:
+            reject(line_no, value)
+            continue
+        if isinstance(value, str):
+            if not value.strip():
+                continue
+            try:
+                value = float(value)
+            except ValueError:
+                reject(line_no, value)
+                continue
+        chunk.append(value)
+        line_nos.append(line_no)
+
+        if len(chunk) == chunk_size:
+            yield from _price_chunk(vat, chunk, line_nos, reject)
+            chunk, line_nos = [], []
+
+    if chunk:
+        yield from _price_chunk(vat, chunk, line_nos, reject)
+
+
+def _price_chunk(vat, chunk, line_nos, reject):
+    batch = add_vat_batch(vat, chunk)
+    for i in batch.rejected:
+        reject(line_nos[i], chunk[i])
+    valid = batch.valid
+    for i, price in enumerate(batch.prices):
+        if valid[i]:
+            yield float(price)
+
+
+# with open('rejects.csv', 'w') as rejects:
+#     for price in stream_add_vat(20, 'prices.csv', column=1, header=True, rejects=rejects):
+#         ...